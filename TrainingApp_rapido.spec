@@ -0,0 +1,68 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Build optimizado para el arranque: pyinstaller TrainingApp_rapido.spec
+# - Carpeta (one-dir) en lugar de un solo EXE: nada se descomprime a un directorio temporal en cada inicio.
+# - Sin UPX: las DLL y .pyd se cargan directo, sin descomprimirse al abrir la app.
+# - Módulos recortados según build/TrainingApp/Analysis-00.toc: se excluye lo que arrastraban
+#   dependencias transitivas (email, tarfile, compresores, sockets, decimal...) y la app no usa.
+# - Runtime hook que inicia la medición de arranque (arranque.py) antes del script principal.
+
+# Módulos presentes en Analysis-00.toc que la app nunca importa
+excluded_modules = [
+    'email', 'tarfile', 'lzma', '_lzma', 'bz2', '_bz2', 'socket', '_socket',
+    'decimal', '_decimal', '_pydecimal', 'fractions', 'statistics', 'ipaddress',
+    'pickle', '_compat_pickle', 'pprint', 'getopt', 'quopri', 'py_compile', 'tracemalloc',
+    'urllib', 'http', 'xml', 'pydoc', 'unittest', 'doctest',
+    'multiprocessing', 'concurrent', 'asyncio', 'benchmark',
+]
+
+# Datos de Tcl/Tk que la app no usa: zonas horarias de `clock`, traducciones y demos de Tk
+excluded_data_prefixes = ('_tcl_data/tzdata', '_tcl_data/msgs', '_tk_data/msgs', '_tk_data/demos', '_tk_data/images')
+
+
+def keep_data(entry):
+    return not entry[0].replace('\\', '/').startswith(excluded_data_prefixes)
+
+
+a = Analysis(
+    ['calendario_entrenamiento.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=['pyi_rth_arranque.py'],
+    excludes=excluded_modules,
+    noarchive=False,
+    optimize=0,
+)
+a.datas = [entry for entry in a.datas if keep_data(entry)]
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='TrainingApp',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='TrainingApp',
+)
@@ -0,0 +1,896 @@
+import csv
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from progreso import MAX_ITEM_ID, MAX_SERIES, item_id_for
+
+# --- Diario de Progreso (solo anexado) ---
+# Cada cambio de series se agrega como una fila al diario (progress.csv.journal),
+# así un cierre inesperado no pierde nada desde el último clic. La compactación
+# vuelca el estado vigente en progress.csv (ordenado por fecha) y vacía el diario.
+# Un progress.csv heredado sin diario se normaliza (ordena) la primera vez que se abre.
+# El progreso se identifica por el ID estable del ejercicio; el nombre se guarda solo como etiqueta.
+PROGRESS_HEADER = ['Date', 'ItemId', 'Item', 'SeriesCompleted']
+JOURNAL_HEADER = ['Date', 'ItemId', 'Item', 'SeriesCompleted', 'Timestamp']
+LEGACY_PROGRESS_HEADER = ['Date', 'Item', 'SeriesCompleted']
+LEGACY_JOURNAL_HEADER = ['Date', 'Item', 'SeriesCompleted', 'Timestamp']
+# Primera generación (entrenamiento.py): un booleano por ejercicio en lugar de series
+COMPLETED_PROGRESS_HEADER = ['Date', 'Exercise', 'Completed']
+JOURNAL_SUFFIX = ".journal"
+COMPACT_THRESHOLD = 1000
+
+
+def write_atomic(path, write_fn, binary=False):
+    # Se escribe en un temporal junto al destino y se reemplaza de una vez: nunca queda un archivo a medias
+    tmp_file = path + ".tmp"
+    try:
+        with (open(tmp_file, mode='wb') if binary else open(tmp_file, mode='w', newline='', encoding='utf-8')) as f:
+            write_fn(f)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        # Si write_fn falla el destino queda intacto y no se deja el temporal
+        if os.path.exists(tmp_file): os.remove(tmp_file)
+        raise
+    os.replace(tmp_file, path)
+
+
+# --- Candado entre Instancias ---
+# Dos ventanas (o una carpeta sincronizada) pueden abrir los mismos archivos. Cada escritura
+# del progreso (anexar, compactar, migrar, archivar) y de plan.json toma un candado de archivo
+# (<archivo>.lock, flock en POSIX y msvcrt en Windows) para no cruzarse con otra instancia.
+# Las lecturas solo se serializan entre hilos: el .lock se crea recién al escribir, así leer
+# una carpeta (resúmenes, analítica, importación) no deja archivos ni falla si es de solo lectura.
+LOCK_SUFFIX = ".lock"
+
+try:
+    import fcntl
+
+    def _lock_file(f): fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    def _unlock_file(f): fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:
+    import msvcrt
+
+    def _lock_file(f):
+        # LK_LOCK reintenta unos 10 s y luego falla: se sigue esperando mientras otra instancia escribe
+        while True:
+            try: f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1); return
+            except OSError: continue
+
+    def _unlock_file(f): f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class FileLock:
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._handle = None
+
+    # "with lock:" serializa solo los hilos de este proceso (lecturas)
+    def __enter__(self):
+        self._thread_lock.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._thread_lock.release()
+
+    @contextmanager
+    def writing(self):
+        # Además toma el candado de archivo; reentrante dentro del proceso
+        with self._thread_lock:
+            if not self._depth:
+                handle = open(self.path, 'a+b')
+                try: _lock_file(handle)
+                except BaseException: handle.close(); raise
+                self._handle = handle
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+                if not self._depth:
+                    handle, self._handle = self._handle, None
+                    try: _unlock_file(handle)
+                    finally: handle.close()
+
+
+def file_stamp(path):
+    # Huella barata para detectar que otro escribió el archivo: (inodo, tamaño, mtime) o None si no existe
+    try: stat = os.stat(path)
+    except FileNotFoundError: return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def content_digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _legacy_item_id(date_str, item_name):
+    return item_id_for(item_name)
+
+
+def _one_series(date_str, item_id):
+    return 1
+
+
+# --- Lectura de Progreso de Cualquier Generación ---
+# La cabecera indica el formato: por ID (actual), por nombre con series (entrenamiento_beta.py
+# y calendario_entrenamientoV2.py) o por nombre con un booleano (entrenamiento.py). Las filas
+# se leen de a una y salen siempre como (fecha, id, nombre, series); los nombres se resuelven a
+# ID con resolve_legacy_id y un "True" vale las series que resolve_completed_series indique.
+# Todo se escribe siempre en el formato actual (write_progress_rows).
+SCHEMA_IDS, SCHEMA_NAMES, SCHEMA_COMPLETED = "ids", "names", "completed"
+PROGRESS_SCHEMAS = {frozenset(PROGRESS_HEADER): SCHEMA_IDS, frozenset(LEGACY_PROGRESS_HEADER): SCHEMA_NAMES, frozenset(COMPLETED_PROGRESS_HEADER): SCHEMA_COMPLETED}
+
+
+def progress_schema(header):
+    # Las columnas pueden venir en cualquier orden; None si la cabecera no es de ningún formato conocido
+    return PROGRESS_SCHEMAS.get(frozenset(column.strip().lstrip("\ufeff") for column in header)) if header else None
+
+
+def valid_progress_row(row):
+    # El ID y las series tienen que caber en las páginas compactas de progreso.py (arrays 'i' y 'H'):
+    # una fila editada a mano con valores fuera de rango se ignora, como una ilegible
+    return 0 <= row[1] <= MAX_ITEM_ID and 0 <= row[3] <= MAX_SERIES
+
+
+def read_progress_rows(path, resolve_legacy_id=_legacy_item_id, resolve_completed_series=_one_series):
+    if not os.path.exists(path): return
+    with open(path, mode='r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = [column.strip() for column in next(reader, None) or []]
+        if not header: return
+        schema = progress_schema(header)
+        if schema is None: raise ValueError(f"{path}: formato de progreso desconocido ({','.join(header)}).")
+        column = {name: position for position, name in enumerate(header)}
+        date_col = column['Date']
+        width = len(header)
+        for row in reader:
+            # Filas incompletas o con valores ilegibles (p. ej. una última línea cortada) se ignoran
+            if len(row) < width: continue
+            date_str = row[date_col]
+            try:
+                if schema == SCHEMA_IDS:
+                    record = date_str, int(row[column['ItemId']]), row[column['Item']], int(row[column['SeriesCompleted']])
+                elif schema == SCHEMA_NAMES:
+                    item_name = row[column['Item']]
+                    record = date_str, resolve_legacy_id(date_str, item_name), item_name, int(row[column['SeriesCompleted']])
+                else:
+                    item_name = row[column['Exercise']]
+                    item_id = resolve_legacy_id(date_str, item_name)
+                    record = date_str, item_id, item_name, resolve_completed_series(date_str, item_id) if row[column['Completed']].strip() == 'True' else 0
+            except ValueError:
+                continue
+            if valid_progress_row(record): yield record
+
+
+def write_progress_rows(f, rows):
+    writer = csv.writer(f)
+    writer.writerow(PROGRESS_HEADER)
+    writer.writerows(rows)
+
+
+def _read_header(path):
+    if not os.path.exists(path): return None
+    with open(path, mode='r', newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), None)
+
+
+def file_progress_schema(path):
+    return progress_schema(_read_header(path))
+
+
+# --- Archivo de Progreso por Año ---
+# El progreso más antiguo que el horizonte (ARCHIVE_HORIZON_DAYS) sale de progress.csv y pasa a
+# un segmento comprimido por año (progress.csv.archive/<año>.seg), así progress.csv y su
+# compactación solo cargan con lo reciente. Cada segmento guarda sus filas por columnas
+# (día del año, ID, series), ordenadas por fecha y comprimidas con zlib; los nombres van en
+# la cabecera. Las lecturas por rango de fechas recorren primero el archivo y luego progress.csv
+# y el diario, que prevalecen si un día archivado se vuelve a marcar.
+ARCHIVE_SUFFIX = ".archive"
+ARCHIVE_MAGIC = b"RKPA"
+ARCHIVE_VERSION = 1
+ARCHIVE_HORIZON_DAYS = 365
+# Se archiva por tandas: solo cuando lo más viejo de progress.csv supera el horizonte en esta cantidad de días
+ARCHIVE_BATCH_DAYS = 90
+MAX_CACHED_SEGMENTS = 2
+
+
+def _column(typecode, values=()):
+    column = array(typecode, values)
+    if column.itemsize != 4: raise RuntimeError(f"array('{typecode}') no es de 32 bits en esta plataforma.")
+    return column
+
+
+class ProgressArchive:
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        self._segments = OrderedDict()
+
+    def segment_file(self, year):
+        return os.path.join(self.archive_dir, f"{year}.seg")
+
+    def years(self):
+        if not os.path.isdir(self.archive_dir): return []
+        return sorted(int(name[:-4]) for name in os.listdir(self.archive_dir) if name.endswith(".seg") and name[:-4].isdigit())
+
+    def first_date(self):
+        years = self.years()
+        return self._segment(years[0])["first"] if years else None
+
+    def rows(self, date_from=None, date_to=None):
+        for year in self.years():
+            if (date_from and str(year) < date_from[:4]) or (date_to and str(year) > date_to[:4]): continue
+            segment = self._segment(year)
+            dates, days = segment["dates"], segment["days"]
+            first_day = date(year, 1, 1)
+            lo = bisect_left(days, (date.fromisoformat(date_from) - first_day).days) if date_from and date_from[:4] == str(year) else 0
+            hi = bisect_right(days, (date.fromisoformat(date_to) - first_day).days) if date_to and date_to[:4] == str(year) else len(days)
+            names, item_ids, series = segment["names"], segment["item_ids"], segment["series"]
+            for row in range(lo, hi):
+                item_id = item_ids[row]
+                yield dates[days[row]], item_id, names.get(item_id, ""), series[row]
+
+    def add(self, rows):
+        # Agrega filas (fecha, id, nombre, series) a los segmentos de su año; lo nuevo reemplaza lo archivado
+        by_year = {}
+        for date_str, item_id, item_name, series_completed in rows:
+            by_year.setdefault(int(date_str[:4]), {})[(date_str, item_id)] = (item_name, series_completed)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        for year, new_rows in sorted(by_year.items()):
+            merged = {(date_str, item_id): (item_name, series_completed)
+                      for date_str, item_id, item_name, series_completed in self.rows(f"{year}-01-01", f"{year}-12-31")}
+            merged.update(new_rows)
+            self._write_segment(year, sorted(merged.items()))
+
+    def _write_segment(self, year, rows):
+        first_day = date(year, 1, 1)
+        days, item_ids, series, names = _column('i'), _column('i'), _column('i'), {}
+        for (date_str, item_id), (item_name, series_completed) in rows:
+            days.append((date.fromisoformat(date_str) - first_day).days)
+            item_ids.append(item_id); series.append(series_completed)
+            names[item_id] = item_name
+        header = json.dumps({"version": ARCHIVE_VERSION, "year": year, "rows": len(rows), "first": rows[0][0][0], "last": rows[-1][0][0],
+                             "names": {str(item_id): name for item_id, name in names.items()}}, ensure_ascii=False).encode('utf-8')
+        columns = [days, item_ids, series]
+        if sys.byteorder != "little":
+            for column in columns: column.byteswap()
+        body = zlib.compress(b"".join(column.tobytes() for column in columns), 9)
+        write_atomic(self.segment_file(year), lambda f: f.write(ARCHIVE_MAGIC + struct.pack("<I", len(header)) + header + body), binary=True)
+        self._segments.pop(year, None)
+
+    def _segment(self, year):
+        # Los segmentos recién leídos quedan descomprimidos: el historial suele pedir varios meses del mismo año
+        if year in self._segments:
+            self._segments.move_to_end(year)
+            return self._segments[year]
+        with open(self.segment_file(year), 'rb') as f: data = f.read()
+        if data[:4] != ARCHIVE_MAGIC: raise ValueError(f"{self.segment_file(year)} no es un segmento de progreso.")
+        header_size = struct.unpack_from("<I", data, 4)[0]
+        header = json.loads(data[8:8 + header_size].decode('utf-8'))
+        body = zlib.decompress(data[8 + header_size:])
+        rows = header["rows"]
+        days, item_ids, series = (_column('i') for _ in range(3))
+        for position, column in enumerate((days, item_ids, series)):
+            column.frombytes(body[position * 4 * rows:(position + 1) * 4 * rows])
+            if sys.byteorder != "little": column.byteswap()
+        first_day = date(year, 1, 1)
+        segment = {"first": header["first"], "days": days, "item_ids": item_ids, "series": series,
+                   "names": {int(item_id): name for item_id, name in header["names"].items()},
+                   "dates": [str(first_day + timedelta(days=day)) for day in range(days[-1] + 1)] if rows else []}
+        self._segments[year] = segment
+        while len(self._segments) > MAX_CACHED_SEGMENTS: self._segments.popitem(last=False)
+        return segment
+
+
+class _UnsortedProgress(Exception):
+    pass
+
+
+class ProgressJournal:
+    def __init__(self, progress_file, compact_threshold=COMPACT_THRESHOLD, archive_horizon_days=ARCHIVE_HORIZON_DAYS):
+        self.progress_file = progress_file
+        self.journal_file = progress_file + JOURNAL_SUFFIX
+        self.compact_threshold = compact_threshold
+        # None desactiva el archivado automático al compactar
+        self.archive_horizon_days = archive_horizon_days
+        self.archive = ProgressArchive(progress_file + ARCHIVE_SUFFIX)
+        self.pending_records = 0
+        # (fecha, nombre) -> ID para las filas heredadas que solo traen el nombre
+        self.resolve_legacy_id = _legacy_item_id
+        # (fecha, ID) -> series que vale un "Completed=True" de la primera generación
+        self.resolve_completed_series = _one_series
+        self._handle = None
+        self._writer = None
+
+    def load(self, date_from=None, date_to=None):
+        completion_status = {}
+        for date_str, item_id, item_name, series_completed in self.rows(date_from, date_to):
+            completion_status.setdefault(date_str, {})[item_id] = series_completed
+        return completion_status
+
+    def rows(self, date_from=None, date_to=None):
+        # Filas (fecha, id, nombre, series) del archivo, luego las de progress.csv y por último las del diario
+        yield from self.archive.rows(date_from, date_to)
+        yield from self._hot_rows(date_from, date_to)
+
+    def _hot_rows(self, date_from=None, date_to=None):
+        in_range = lambda d: (date_from is None or d >= date_from) and (date_to is None or d <= date_to)
+        if (date_from is None and date_to is None) or not self._base_is_sorted() or self.needs_item_id_migration():
+            base_rows = self._read_base()
+        else:
+            base_rows = self._read_base_range(date_from or "", date_to or "9999-12-31")
+        for row in base_rows:
+            if in_range(row[0]): yield row
+        self.pending_records = 0
+        for row in self._read_journal():
+            self.pending_records += 1
+            if in_range(row[0]): yield row
+
+    def first_date(self):
+        # Fecha más antigua registrada: con progress.csv ordenado basta la primera fila
+        base_dates = (row[0] for row in self._read_base())
+        first = next(base_dates, None) if self._base_is_sorted() else min(base_dates, default=None)
+        journal_first = min((row[0] for row in self._read_journal()), default=None)
+        return min((d for d in (self.archive.first_date(), first, journal_first) if d is not None), default=None)
+
+    def needs_item_id_migration(self):
+        return file_progress_schema(self.progress_file) not in (None, SCHEMA_IDS) or _read_header(self.journal_file) == LEGACY_JOURNAL_HEADER
+
+    def migrate_item_ids(self, resolve_legacy_id, resolve_completed_series=None):
+        # Migración única desde los formatos por nombre: progress.csv se reescribe con IDs en una sola pasada
+        self.resolve_legacy_id = resolve_legacy_id
+        self.resolve_completed_series = resolve_completed_series or _one_series
+        try:
+            if not self._upgrade_in_place(): self.compact()
+        finally:
+            self.resolve_legacy_id, self.resolve_completed_series = _legacy_item_id, _one_series
+
+    def _upgrade_in_place(self):
+        # Las apps anteriores escribían los días en orden de fecha, así que basta convertir fila a fila.
+        # Si aparece una fecha fuera de orden o un ID repetido en el día, se abandona (sin tocar el
+        # archivo) y se devuelve False para que la compactación ordene todo en memoria.
+        journal_rows = list(self._read_journal())
+        self.close()
+        def write_rows(f):
+            previous_date, day_ids = "", set()
+            def checked_rows():
+                nonlocal previous_date, day_ids
+                for row in self._read_base():
+                    if row[0] != previous_date:
+                        if row[0] < previous_date: raise _UnsortedProgress()
+                        previous_date, day_ids = row[0], set()
+                    if row[1] in day_ids: raise _UnsortedProgress()
+                    day_ids.add(row[1])
+                    yield row
+            write_progress_rows(f, checked_rows())
+        try:
+            if os.path.exists(self.progress_file): write_atomic(self.progress_file, write_rows)
+        except _UnsortedProgress:
+            return False
+        # El diario heredado (pocas filas) se reescribe con IDs; su existencia marca progress.csv como ordenado
+        def write_journal(f):
+            writer = csv.writer(f)
+            writer.writerow(JOURNAL_HEADER)
+            timestamp = datetime.now().isoformat(timespec='seconds')
+            writer.writerows([*row, timestamp] for row in journal_rows)
+        write_atomic(self.journal_file, write_journal)
+        self.pending_records = len(journal_rows)
+        return True
+
+    # La compactación escribe progress.csv ordenado por fecha y deja el diario vacío (solo cabecera);
+    # mientras exista el diario se puede buscar un rango por bisección sin recorrer todo el archivo.
+    def _base_is_sorted(self):
+        return os.path.exists(self.journal_file)
+
+    def _read_base(self):
+        return read_progress_rows(self.progress_file, self.resolve_legacy_id, self.resolve_completed_series)
+
+    def _read_base_range(self, date_from, date_to):
+        if not os.path.exists(self.progress_file): return
+        with open(self.progress_file, 'rb') as f:
+            header_line = f.readline()
+            if not header_line: return
+            # Mismas columnas (en cualquier orden) que reconoce read_progress_rows
+            header = [column.strip() for column in next(csv.reader([header_line.decode('utf-8-sig')]), [])]
+            if progress_schema(header) != SCHEMA_IDS:
+                yield from self._read_base(); return
+            column = {name: position for position, name in enumerate(header)}
+            date_col, id_col, item_col, series_col = column['Date'], column['ItemId'], column['Item'], column['SeriesCompleted']
+            width = len(header)
+            def parse(line):
+                row = next(csv.reader([line.decode('utf-8', errors='replace')]), None)
+                return row if row and len(row) >= width else None
+            size = f.seek(0, os.SEEK_END)
+            # Menor posición cuya primera línea completa tenga fecha >= date_from. Una línea ilegible
+            # cuenta como posterior: a lo sumo se empieza antes y sobran filas que se filtran después
+            lo, hi = len(header_line), size
+            while lo < hi:
+                mid = (lo + hi) // 2
+                f.seek(mid - 1); f.readline()
+                row = parse(f.readline())
+                if row is None or row[date_col] >= date_from: hi = mid
+                else: lo = mid + 1
+            f.seek(lo - 1); f.readline()
+            # Las filas del rango se juntan antes de devolverlas: si el archivo resulta desordenado se
+            # recorre completo sin haber entregado ya algunas (saldrían repetidas)
+            records, previous_date = [], ""
+            for raw_line in f:
+                # Filas incompletas o con valores ilegibles se ignoran, como en read_progress_rows
+                row = parse(raw_line)
+                if row is None: continue
+                date_str = row[date_col]
+                if date_str < previous_date:
+                    # El archivo fue editado a mano y ya no está ordenado
+                    records = None; break
+                if date_str > date_to: break
+                try: record = date_str, int(row[id_col]), row[item_col], int(row[series_col])
+                except ValueError: continue
+                previous_date = date_str
+                if valid_progress_row(record): records.append(record)
+        yield from self._read_base() if records is None else records
+
+    def _read_journal(self):
+        if not os.path.exists(self.journal_file): return
+        with open(self.journal_file, mode='r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            legacy = next(reader, None) == LEGACY_JOURNAL_HEADER
+            expected_fields = len(LEGACY_JOURNAL_HEADER) if legacy else len(JOURNAL_HEADER)
+            for row in reader:
+                # Se ignora una posible última línea truncada por un corte, o con valores fuera de rango
+                if len(row) < expected_fields: continue
+                try:
+                    if legacy: record = row[0], self.resolve_legacy_id(row[0], row[1]), row[1], int(row[2])
+                    else: record = row[0], int(row[1]), row[2], int(row[3])
+                except ValueError: continue
+                if valid_progress_row(record): yield record
+
+    def append(self, date_str, item_id, item_name, series_completed):
+        self.append_many([(date_str, item_id, item_name, series_completed)])
+
+    def append_many(self, records):
+        # Un solo fsync por lote de filas
+        if self._handle is not None and self._replaced(): self.close()
+        if self._handle is None: self._open_for_append()
+        timestamp = datetime.now().isoformat(timespec='seconds')
+        self._writer.writerows([date_str, item_id, item_name, series_completed, timestamp] for date_str, item_id, item_name, series_completed in records)
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self.pending_records += len(records)
+
+    def _replaced(self):
+        # Otra instancia migró o borró el diario: el descriptor abierto apunta a un archivo que ya no está
+        stamp = file_stamp(self.journal_file)
+        return stamp is None or stamp[0] != os.fstat(self._handle.fileno()).st_ino
+
+    def _open_for_append(self):
+        if self.needs_item_id_migration(): self.compact()
+        size = os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+        needs_newline = False
+        if size:
+            with open(self.journal_file, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._handle = open(self.journal_file, mode='a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._handle)
+        if needs_newline: self._handle.write("\r\n")
+        if not size: self._writer.writerow(JOURNAL_HEADER)
+
+    def needs_compaction(self):
+        return (self.pending_records >= self.compact_threshold or (os.path.exists(self.progress_file) and not self._base_is_sorted())
+                or self._archive_cutoff(self._first_base_date()) is not None)
+
+    def _first_base_date(self):
+        # Con progress.csv ordenado la fecha más vieja es la de la primera fila
+        if not self._base_is_sorted(): return None
+        return next((row[0] for row in self._read_base()), None)
+
+    def _archive_cutoff(self, oldest_date):
+        # Fecha límite para archivar, o None si lo más viejo aún no supera el horizonte más una tanda
+        if self.archive_horizon_days is None or oldest_date is None: return None
+        cutoff = date.today() - timedelta(days=self.archive_horizon_days)
+        return str(cutoff) if oldest_date < str(cutoff - timedelta(days=ARCHIVE_BATCH_DAYS)) else None
+
+    def compact(self, archive_before=None):
+        # Se relee progress.csv + diario, así la compactación no depende de lo que la app tenga en memoria.
+        # Lo anterior a archive_before (o al horizonte, cuando toca archivar) pasa a los segmentos por año.
+        latest = {}
+        for date_str, item_id, item_name, series_completed in self._hot_rows():
+            latest[(date_str, item_id)] = (item_name, series_completed)
+        self.close()
+        archive_before = archive_before or self._archive_cutoff(min((date_str for date_str, _ in latest), default=None))
+        if archive_before:
+            old_keys = [key for key in latest if key[0] < archive_before]
+            # Los segmentos se escriben antes que progress.csv: un corte en medio deja filas repetidas, nunca perdidas
+            if old_keys: self.archive.add([(date_str, item_id, *latest[(date_str, item_id)]) for date_str, item_id in old_keys])
+            for key in old_keys: del latest[key]
+        write_atomic(self.progress_file, lambda f: write_progress_rows(f, ((date_str, item_id, item_name, series_completed)
+                                                                          for (date_str, item_id), (item_name, series_completed) in sorted(latest.items()))))
+        # Reaplicar el diario sobre el nuevo progress.csv es idempotente, por lo que
+        # un corte entre el reemplazo y el vaciado no pierde ni duplica datos.
+        with open(self.journal_file, mode='w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(JOURNAL_HEADER)
+        self.pending_records = 0
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle, self._writer = None, None
+
+
+# --- Unión de Planes entre Instancias ---
+# Si plan.json cambió desde la última vez que esta instancia lo leyó o escribió, se une campo
+# a campo en tres vías: base (lo último que vio esta instancia), lo nuestro y lo del disco.
+# Gana el lado que cambió respecto de base; si cambiaron ambos el mismo campo, lo nuestro.
+# Los ejercicios se emparejan por ID, así agregar, editar o borrar ejercicios distintos desde
+# dos ventanas conserva los cambios de ambas.
+_MISSING = object()
+
+
+def _by_id(values):
+    # Lista de ejercicios -> {id: ejercicio}, o None si no es una lista de ejercicios con ID
+    if not isinstance(values, list) or not all(isinstance(value, dict) and "id" in value for value in values): return None
+    return {value["id"]: value for value in values}
+
+
+def _legacy_base_by_id(base, *sides):
+    # Base leída de un plan.json antiguo (sin IDs, que se asignan al cargar): cada ejercicio de base
+    # se empareja por nombre y aparición con los de cada lado, así sus ediciones no parecen altas nuevas
+    if not isinstance(base, list): return {}
+    by_name = {}
+    for value in base:
+        if isinstance(value, dict): by_name.setdefault(value.get("name"), []).append(value)
+    base_ids = {}
+    for side in sides:
+        seen = {}
+        for item_id, value in side.items():
+            name = value.get("name")
+            occurrence = seen[name] = seen.get(name, -1) + 1
+            matches = by_name.get(name, ())
+            if occurrence < len(matches): base_ids.setdefault(item_id, {**matches[occurrence], "id": item_id})
+    return base_ids
+
+
+def _merge_value(base, ours, theirs):
+    if ours == theirs or theirs == base: return ours
+    if ours == base: return theirs
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        base = base if isinstance(base, dict) else {}
+        merged = ((key, _merge_value(base.get(key, _MISSING), ours.get(key, _MISSING), theirs.get(key, _MISSING))) for key in dict.fromkeys([*ours, *theirs]))
+        return {key: value for key, value in merged if value is not _MISSING}
+    ours_ids, theirs_ids = _by_id(ours), _by_id(theirs)
+    if ours_ids is not None and theirs_ids is not None:
+        base_ids = _by_id(base)
+        if base_ids is None: base_ids = _legacy_base_by_id(base, ours_ids, theirs_ids)
+        merged = (_merge_value(base_ids.get(item_id, _MISSING), ours_ids.get(item_id, _MISSING), theirs_ids.get(item_id, _MISSING))
+                  for item_id in dict.fromkeys([*ours_ids, *theirs_ids]))
+        return [value for value in merged if value is not _MISSING]
+    return ours
+
+
+def merge_plans(base, ours, theirs):
+    return _merge_value(base, ours, theirs)
+
+
+# --- Motores de Almacenamiento ---
+# Ambos exponen la misma interfaz (load_plan, save_plan, load_progress, record_series,
+# needs_item_id_migration, migrate_item_ids, close). load_progress admite un rango de
+# fechas "YYYY-MM-DD" y devuelve {fecha: {id_ejercicio: series_completadas}}.
+# save_plan recibe además los días modificados (None = todos) para escribir solo lo que cambió.
+# progress_version cambia solo cuando otra instancia escribe progreso (ver ProgressStore.refresh)
+# y poll_plan devuelve el plan si se editó por fuera (recarga en caliente).
+def plan_json(plan):
+    # plan.json siempre con sangría: se edita a mano (y se recarga en caliente), así que guardar no
+    # debe cambiarle el formato. Como solo se escribe cuando el plan cambia, la sangría casi no cuesta
+    return json.dumps(plan, ensure_ascii=False, indent=4).encode('utf-8')
+
+
+def export_plan(plan, plan_file):
+    # Copia legible del plan, para editarla a mano o llevarla a otra instalación
+    write_atomic(plan_file, lambda f: f.write(plan_json(plan)), binary=True)
+
+
+class FileStorage:
+    def __init__(self, plan_file, progress_file, archive_horizon_days=ARCHIVE_HORIZON_DAYS):
+        self.plan_file = plan_file
+        self.progress_file = progress_file
+        self.journal = ProgressJournal(progress_file, archive_horizon_days=archive_horizon_days)
+        # Serializa el diario entre la interfaz (lecturas) y el hilo de autoguardado; las escrituras
+        # (lock.writing()) se serializan también con otras instancias
+        self.lock = FileLock(progress_file + LOCK_SUFFIX)
+        self.plan_lock = FileLock(plan_file + LOCK_SUFFIX)
+        # plan.json tal como lo vio esta instancia por última vez: huella, contenido (hash) y JSON base para unir
+        self._plan_stamp, self._plan_digest, self._plan_base = None, None, None
+        # Lo último de plan.json que la app ya tiene en memoria, para la recarga en caliente (poll_plan)
+        self._watch_stamp, self._watch_digest = None, None
+        # Escrituras de progreso de otras instancias detectadas (versión) y hasta cuál ya se tuvo en cuenta
+        self._progress_stamp = self._read_progress_stamp()
+        self._progress_version = self._synced_version = 0
+
+    def load_plan(self):
+        # plan.json se reemplaza de una vez (write_atomic): se puede leer sin el candado de archivo
+        with self.plan_lock:
+            stamp = file_stamp(self.plan_file)
+            try:
+                with open(self.plan_file, 'rb') as f: data = f.read()
+            except FileNotFoundError:
+                return None
+        try: plan = json.loads(data)
+        except (json.JSONDecodeError, UnicodeDecodeError): return None
+        self._plan_stamp, self._plan_digest, self._plan_base = stamp, content_digest(data), data
+        self._watch_stamp, self._watch_digest = stamp, self._plan_digest
+        return plan
+
+    def poll_plan(self):
+        # Recarga en caliente: devuelve plan.json si alguien lo editó por fuera desde que la app lo tiene,
+        # si no None. En el caso común cuesta un stat; solo se parsea si además cambió el contenido.
+        if file_stamp(self.plan_file) == self._watch_stamp: return None
+        with self.plan_lock:
+            self._watch_stamp = file_stamp(self.plan_file)
+            try:
+                with open(self.plan_file, 'rb') as f: data = f.read()
+            except FileNotFoundError:
+                return None
+        digest = content_digest(data)
+        if digest == self._watch_digest: return None
+        try: plan = json.loads(data)
+        except (json.JSONDecodeError, UnicodeDecodeError): return None
+        self._watch_digest = digest
+        return plan
+
+    def save_plan(self, plan, days=None):
+        ours = plan_json(plan)
+        with self.plan_lock.writing():
+            payload = self._merge_external_plan(plan, ours)
+            write_atomic(self.plan_file, lambda f: f.write(payload), binary=True)
+            # La base es lo nuestro (no lo unido): así el próximo guardado no revierte lo que trajo la otra
+            # instancia. Tras una unión el disco difiere de lo nuestro y se vuelve a unir hasta releer el plan.
+            self._plan_stamp = file_stamp(self.plan_file) if payload is ours else None
+            self._plan_digest, self._plan_base = content_digest(ours), ours
+            # Lo propio no se recarga; lo unido con otra instancia sí, para que la app vea sus cambios
+            if payload is ours: self._watch_stamp, self._watch_digest = self._plan_stamp, self._plan_digest
+
+    def _merge_external_plan(self, plan, ours):
+        # Solo se relee y parsea plan.json si su huella cambió y además su contenido es otro
+        if self._plan_base is None or file_stamp(self.plan_file) == self._plan_stamp: return ours
+        try:
+            with open(self.plan_file, 'rb') as f: data = f.read()
+            if content_digest(data) == self._plan_digest: return ours
+            merged = merge_plans(json.loads(self._plan_base), plan, json.loads(data))
+        except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError):
+            return ours
+        return plan_json(merged)
+
+    # --- Progreso Compartido ---
+    # Cada escritura propia recuerda la huella de progress.csv + diario; si al escribir otra vez la
+    # huella es otra, escribió otra instancia y las series nuevas se unen tomando el máximo con lo
+    # guardado (a menos que ProgressStore ya haya releído y unido esos cambios: mark_progress_synced).
+    def _read_progress_stamp(self):
+        return file_stamp(self.progress_file), file_stamp(self.journal.journal_file)
+
+    def _detect_external_progress(self):
+        stamp = self._read_progress_stamp()
+        if stamp != self._progress_stamp: self._progress_stamp, self._progress_version = stamp, self._progress_version + 1
+
+    def progress_version(self):
+        # Cambia solo cuando otra instancia escribió progreso; cuesta dos stat
+        with self.lock:
+            self._detect_external_progress()
+            return self._progress_version
+
+    def mark_progress_synced(self, version):
+        with self.lock: self._synced_version = max(self._synced_version, version)
+
+    def _merge_max(self, records):
+        stored = self.journal.load(min(record[0] for record in records), max(record[0] for record in records))
+        return [(date_str, item_id, item_name, max(series_completed, stored.get(date_str, {}).get(item_id, 0)))
+                for date_str, item_id, item_name, series_completed in records]
+
+    def load_progress(self, date_from=None, date_to=None):
+        with self.lock: return self.journal.load(date_from, date_to)
+
+    def iter_progress(self):
+        latest = {}
+        for date_str, item_id, item_name, series_completed in self.journal.rows():
+            latest[(date_str, item_id)] = (item_name, series_completed)
+        for (date_str, item_id), (item_name, series_completed) in sorted(latest.items()):
+            yield date_str, item_id, item_name, series_completed
+
+    def first_progress_date(self):
+        with self.lock: return self.journal.first_date()
+
+    def record_series(self, date_str, item_id, item_name, series_completed):
+        self.record_series_batch([(date_str, item_id, item_name, series_completed)])
+
+    def record_series_batch(self, records):
+        with self.lock.writing():
+            self._detect_external_progress()
+            if self._progress_version != self._synced_version: records = self._merge_max(records)
+            self.journal.append_many(records)
+            self._progress_stamp, self._synced_version = self._read_progress_stamp(), self._progress_version
+
+    def needs_item_id_migration(self):
+        return self.journal.needs_item_id_migration()
+
+    def migrate_item_ids(self, resolve_legacy_id, resolve_completed_series=None):
+        with self.lock.writing():
+            self._detect_external_progress()
+            self.journal.migrate_item_ids(resolve_legacy_id, resolve_completed_series)
+            self._progress_stamp = self._read_progress_stamp()
+
+    def archive_progress(self, before):
+        # Archiva ya todo lo anterior a la fecha dada, sin esperar a la próxima compactación
+        with self.lock.writing():
+            self._detect_external_progress()
+            self.journal.compact(archive_before=before)
+            self._progress_stamp = self._read_progress_stamp()
+
+    def close(self):
+        with self.lock:
+            if self.journal.needs_compaction():
+                with self.lock.writing():
+                    self._detect_external_progress()
+                    self.journal.compact()
+            self.journal.close()
+
+
+UPSERT_PROGRESS = ("INSERT INTO progress (date, item_id, item, series_completed, updated_at) VALUES (?, ?, ?, ?, ?) "
+                   "ON CONFLICT(date, item_id) DO UPDATE SET item = excluded.item, series_completed = excluded.series_completed, updated_at = excluded.updated_at")
+# Si otra conexión escribió desde la última escritura propia, las series se unen por el máximo
+UPSERT_PROGRESS_MAX = UPSERT_PROGRESS.replace("series_completed = excluded.series_completed", "series_completed = MAX(series_completed, excluded.series_completed)")
+
+
+class SqliteStorage:
+    def __init__(self, db_file):
+        self.db_file = db_file
+        # La conexión se comparte entre la interfaz (lecturas) y el hilo de autoguardado (escrituras)
+        # sqlite3 se importa solo si se usa la base: la app con archivos arranca sin cargarlo
+        import sqlite3
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS plan_days (day TEXT PRIMARY KEY, position INTEGER NOT NULL, content TEXT NOT NULL)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS progress (date TEXT NOT NULL, item_id INTEGER, item TEXT NOT NULL, series_completed INTEGER NOT NULL, updated_at TEXT NOT NULL)")
+            if not self.needs_item_id_migration():
+                self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_progress_date_item_id ON progress (date, item_id)")
+        self._synced_version = self.progress_version()
+
+    def load_plan(self):
+        with self.lock: rows = self.conn.execute("SELECT day, content FROM plan_days ORDER BY position").fetchall()
+        return {day: json.loads(content) for day, content in rows} or None
+
+    def save_plan(self, plan, days=None):
+        # Cada día es una fila: con los días modificados se actualizan solo esas filas
+        with self.lock, self.conn:
+            if days is None: self.conn.execute(f"DELETE FROM plan_days WHERE day NOT IN ({','.join('?' * len(plan))})", list(plan))
+            self.conn.executemany("INSERT INTO plan_days (day, position, content) VALUES (?, ?, ?) "
+                                  "ON CONFLICT(day) DO UPDATE SET position = excluded.position, content = excluded.content",
+                                  [(day, i, json.dumps(content, ensure_ascii=False)) for i, (day, content) in enumerate(plan.items()) if days is None or day in days])
+
+    def poll_plan(self):
+        # El plan vive en la base y no hay un plan.json que editar a mano: nada que recargar
+        return None
+
+    def load_progress(self, date_from=None, date_to=None):
+        completion_status = {}
+        with self.lock:
+            rows = self.conn.execute("SELECT date, item_id, series_completed FROM progress WHERE date >= ? AND date <= ?",
+                                     (date_from or "", date_to or "9999-12-31")).fetchall()
+        for date_str, item_id, series_completed in rows:
+            completion_status.setdefault(date_str, {})[item_id] = series_completed
+        return completion_status
+
+    def iter_progress(self):
+        yield from self.conn.execute("SELECT date, item_id, item, series_completed FROM progress ORDER BY date, item_id")
+
+    def first_progress_date(self):
+        with self.lock: return self.conn.execute("SELECT MIN(date) FROM progress").fetchone()[0]
+
+    def record_series(self, date_str, item_id, item_name, series_completed, updated_at=None):
+        self.record_series_batch([(date_str, item_id, item_name, series_completed)], updated_at)
+
+    def record_series_batch(self, records, updated_at=None):
+        # Todo el lote en una sola transacción
+        updated_at = updated_at or datetime.now().isoformat(timespec='seconds')
+        with self.lock, self.conn:
+            version = self.progress_version()
+            self.conn.executemany(UPSERT_PROGRESS if version == self._synced_version else UPSERT_PROGRESS_MAX, [record + (updated_at,) for record in records])
+            self._synced_version = version
+
+    def progress_version(self):
+        # data_version solo cambia cuando otra conexión confirma cambios en la base
+        with self.lock: return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def mark_progress_synced(self, version):
+        with self.lock: self._synced_version = version
+
+    # Bases creadas antes de los IDs estables: la tabla progress no tiene la columna item_id
+    def needs_item_id_migration(self):
+        with self.lock: columns = [row[1] for row in self.conn.execute("PRAGMA table_info(progress)")]
+        return "item_id" not in columns
+
+    def migrate_item_ids(self, resolve_legacy_id, resolve_completed_series=None):
+        # Las bases SQLite nunca tuvieron el formato de booleanos, así que resolve_completed_series no se usa
+        with self.lock, self.conn:
+            self.conn.execute("ALTER TABLE progress ADD COLUMN item_id INTEGER")
+            names = self.conn.execute("SELECT DISTINCT date, item FROM progress").fetchall()
+            self.conn.executemany("UPDATE progress SET item_id = ? WHERE date = ? AND item = ?",
+                                  [(resolve_legacy_id(date_str, item_name), date_str, item_name) for date_str, item_name in names])
+            self.conn.execute("DROP INDEX IF EXISTS idx_progress_date_item")
+            self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_progress_date_item_id ON progress (date, item_id)")
+
+    # --- Importación / Exportación al formato plan.json + progress.csv ---
+    def import_files(self, plan_file, progress_file):
+        # El plan se guarda con IDs y el progreso por nombre se resuelve contra él (día de la semana,
+        # series planificadas), igual que al abrir los archivos desde la app. nucleo importa este
+        # módulo, por eso TrainingPlan se importa aquí
+        from nucleo import TrainingPlan
+        source = FileStorage(plan_file, progress_file)
+        try:
+            plan = TrainingPlan.from_storage(source)
+            if os.path.exists(plan_file): self.save_plan(plan.days)
+            if source.needs_item_id_migration():
+                source.journal.resolve_legacy_id, source.journal.resolve_completed_series = plan.resolve_legacy_id(), plan.resolve_completed_series()
+            now = datetime.now().isoformat(timespec='seconds')
+            with self.conn:
+                self.conn.executemany(UPSERT_PROGRESS, (row + (now,) for row in source.iter_progress()))
+        finally:
+            source.journal.close()
+
+    def export_files(self, plan_file, progress_file):
+        plan = self.load_plan()
+        if plan is not None: export_plan(plan, plan_file)
+        with open(progress_file, mode='w', newline='', encoding='utf-8') as f:
+            write_progress_rows(f, self.iter_progress())
+
+    def close(self):
+        with self.lock: self.conn.close()
+
+
+# Se usa SQLite si ya existe la base de datos o si se pide con TRAINING_STORAGE=sqlite
+STORAGE_DB_FILE = "training.db"
+
+def open_storage(plan_file, progress_file, db_file=STORAGE_DB_FILE):
+    if os.environ.get("TRAINING_STORAGE", "").lower() == "sqlite" or os.path.exists(db_file):
+        return SqliteStorage(db_file)
+    return FileStorage(plan_file, progress_file)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Importa o exporta plan.json/progress.csv desde una base SQLite, o archiva el progreso antiguo.")
+    parser.add_argument("action", choices=["importar", "exportar", "archivar", "exportar-plan"])
+    parser.add_argument("--db", default=STORAGE_DB_FILE)
+    parser.add_argument("--plan", default="plan.json")
+    parser.add_argument("--progress", default="progress.csv")
+    parser.add_argument("--salida", default="plan_exportado.json", help="Destino de exportar-plan")
+    parser.add_argument("--horizonte", type=int, default=ARCHIVE_HORIZON_DAYS, help="Días de progreso que quedan en progress.csv al archivar")
+    args = parser.parse_args()
+    if args.action == "archivar":
+        storage = FileStorage(args.plan, args.progress)
+        storage.archive_progress(str(date.today() - timedelta(days=args.horizonte)))
+        storage.close()
+        print(f"Segmentos: {', '.join(map(str, storage.journal.archive.years())) or 'ninguno'}")
+        sys.exit()
+    if args.action == "exportar-plan":
+        # Copia legible del plan en uso (plan.json o training.db)
+        storage = open_storage(args.plan, args.progress, args.db)
+        export_plan(storage.load_plan(), args.salida)
+        storage.close()
+        sys.exit()
+    storage = SqliteStorage(args.db)
+    if args.action == "importar": storage.import_files(args.plan, args.progress)
+    else: storage.export_files(args.plan, args.progress)
+    storage.close()
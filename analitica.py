@@ -0,0 +1,276 @@
+import json
+import os
+import numpy as np
+from almacenamiento import FileStorage
+from nucleo import WEEKDAY_NAMES, TrainingPlan
+
+# --- Analítica de Volumen y Adherencia ---
+# El historial de uno o varios atletas se carga una vez en columnas NumPy (atleta, día,
+# ejercicio, series) y todas las métricas se calculan con operaciones vectorizadas: sumas
+# agrupadas con bincount sobre códigos enteros, series planificadas desde una tabla densa
+# (plantilla, día de la semana, ejercicio) y rachas y adherencia móvil con sumas acumuladas
+# sobre una matriz atletas x días.
+# Los días se guardan como ordinales desde 1970-01-01 (un jueves), así el día de la
+# semana y la semana se obtienen con aritmética entera sobre todo el arreglo a la vez.
+EPOCH_WEEKDAY = 3
+DEFAULT_ADHERENCE_WINDOW = 28
+
+
+def weekday_of(days):
+    # 0 = lunes, igual que date.weekday()
+    return (days + EPOCH_WEEKDAY) % 7
+
+
+def week_of(days):
+    # Semanas que empiezan en lunes, numeradas desde la del 1970-01-01
+    return (days + EPOCH_WEEKDAY) // 7
+
+
+def week_start(weeks):
+    return (weeks * 7 - EPOCH_WEEKDAY).astype('datetime64[D]')
+
+
+def plan_series(plan_days):
+    # {(día de la semana, id): series planificadas}; una actividad principal cuenta como una serie
+    planned = {}
+    for weekday, day_name in enumerate(WEEKDAY_NAMES):
+        day_content = plan_days.get(day_name, {})
+        if day_content.get("activity"): planned[(weekday, day_content["activity_id"])] = 1
+        for ex in day_content.get("exercises", []): planned[(weekday, ex["id"])] = ex.get("series", 1)
+    return planned
+
+
+class ProgressColumns:
+    def __init__(self, athletes, plans, athlete_plan, athlete, day, item, series, names=None):
+        self.athletes = list(athletes)
+        self.plans = list(plans)
+        # Índice en self.plans de cada atleta: varios atletas pueden compartir una misma plantilla
+        self.athlete_plan = np.asarray(athlete_plan, dtype=np.int32)
+        self.athlete = np.asarray(athlete, dtype=np.int32)
+        self.day = np.asarray(day, dtype=np.int32)
+        self.item = np.asarray(item, dtype=np.int64)
+        self.series = np.asarray(series, dtype=np.int32)
+        self.names = names or {}
+        self._item_ids = self._item_code = None
+        self._planned = self._daily_planned = None
+
+    @classmethod
+    def from_storages(cls, entries):
+        # entries: [(nombre del atleta, plan.days, almacenamiento)]
+        athletes, plans, plan_index, athlete_plan, names = [], [], {}, [], {}
+        athlete_parts, date_parts, item_parts, series_parts = [], [], [], []
+        for index, (athlete_name, plan_days, storage) in enumerate(entries):
+            athletes.append(athlete_name)
+            if id(plan_days) not in plan_index: plan_index[id(plan_days)] = len(plans); plans.append(plan_days)
+            athlete_plan.append(plan_index[id(plan_days)])
+            rows = list(storage.iter_progress())
+            if not rows: continue
+            dates, items, item_names, series = zip(*rows)
+            names.update(zip(items, item_names))
+            athlete_parts.append(np.full(len(rows), index, dtype=np.int32))
+            date_parts.append(np.array(dates, dtype='datetime64[D]'))
+            item_parts.append(np.array(items, dtype=np.int64))
+            series_parts.append(np.array(series, dtype=np.int32))
+        concat = lambda parts, dtype: np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+        day = concat(date_parts, 'datetime64[D]').astype(np.int64)
+        return cls(athletes, plans, athlete_plan, concat(athlete_parts, np.int32), day, concat(item_parts, np.int64), concat(series_parts, np.int32), names)
+
+    @classmethod
+    def from_folders(cls, folders):
+        # Una carpeta por atleta con plan.json y progress.csv
+        entries = []
+        for folder in folders:
+            storage = FileStorage(os.path.join(folder, "plan.json"), os.path.join(folder, "progress.csv"))
+            entries.append((os.path.basename(os.path.normpath(folder)), TrainingPlan.from_storage(storage).days, storage))
+        try:
+            return cls.from_storages(entries)
+        finally:
+            for _, _, storage in entries: storage.journal.close()
+
+    @classmethod
+    def from_athletes(cls, directory, athlete_ids=None):
+        # Modo de varios atletas: cada plantilla se lee una vez y la comparten sus atletas
+        entries = []
+        for athlete_id in athlete_ids or [athlete_id for athlete_id, _ in directory.names()]:
+            storage = directory.open_storage(athlete_id)
+            entries.append((directory.athletes[athlete_id]["name"], directory.plan_for(athlete_id, storage).days, storage))
+        try:
+            return cls.from_storages(entries)
+        finally:
+            for _, _, storage in entries: storage.journal.close()
+
+    # --- Caché en .npz ---
+    # Releer CSV de años y muchos atletas domina el tiempo total; las columnas se guardan tal cual
+    def save(self, path):
+        meta = json.dumps({"athletes": self.athletes, "plans": self.plans, "names": {str(k): v for k, v in self.names.items()}}, ensure_ascii=False)
+        np.savez_compressed(path, athlete_plan=self.athlete_plan, athlete=self.athlete, day=self.day, item=self.item, series=self.series, meta=np.array(meta))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(meta["athletes"], meta["plans"], data["athlete_plan"], data["athlete"], data["day"], data["item"], data["series"],
+                       {int(k): v for k, v in meta["names"].items()})
+
+    def __len__(self):
+        return len(self.day)
+
+    def _encode_items(self):
+        # IDs distintos ordenados; el código de cada fila es su posición en ese arreglo. Hay pocos
+        # ejercicios y muchas filas, así que se prueba primero con los IDs de una muestra (searchsorted
+        # es mucho más barato que ordenar todo) y solo si falta alguno se ordena la columna completa.
+        sample_ids = np.unique(self.item[::64])
+        codes = np.minimum(np.searchsorted(sample_ids, self.item), max(len(sample_ids) - 1, 0))
+        if len(sample_ids) and np.array_equal(sample_ids[codes], self.item):
+            self._item_ids, self._item_code = sample_ids, codes
+        else:
+            self._item_ids, item_code = np.unique(self.item, return_inverse=True)
+            self._item_code = item_code.reshape(-1)
+
+    @property
+    def item_ids(self):
+        if self._item_ids is None: self._encode_items()
+        return self._item_ids
+
+    @property
+    def item_code(self):
+        if self._item_code is None: self._encode_items()
+        return self._item_code
+
+    # --- Series Planificadas ---
+    @property
+    def planned(self):
+        # Series planificadas para cada fila; 0 si el ejercicio no está en el plan de ese día de la semana.
+        # Tabla densa (plantilla, día de la semana, ejercicio) indexada directamente, sin búsquedas por fila
+        if self._planned is None:
+            table = np.zeros((max(len(self.plans), 1), 7, max(len(self.item_ids), 1)), dtype=np.int32)
+            for plan_index, plan_days in enumerate(self.plans):
+                for (weekday, item_id), series in plan_series(plan_days).items():
+                    position = np.searchsorted(self.item_ids, item_id)
+                    if position < len(self.item_ids) and self.item_ids[position] == item_id: table[plan_index, weekday, position] = series
+            self._planned = table[self.athlete_plan[self.athlete], weekday_of(self.day), self.item_code] if len(self) else np.empty(0, np.int32)
+        return self._planned
+
+    @property
+    def daily_planned(self):
+        # Total de series planificadas por plantilla y día de la semana, forma (plantillas, 7)
+        if self._daily_planned is None:
+            self._daily_planned = np.zeros((max(len(self.plans), 1), 7), dtype=np.int64)
+            for plan_index, plan_days in enumerate(self.plans):
+                for (weekday, _), series in plan_series(plan_days).items(): self._daily_planned[plan_index, weekday] += series
+        return self._daily_planned
+
+
+def _grouped_sums(codes, *weights):
+    # Suma cada arreglo de pesos agrupando por varias columnas de códigos enteros (desde 0) a la vez.
+    # Si las combinaciones posibles son pocas se suman con bincount directo sobre la celda combinada,
+    # sin ordenar; si no, se agrupa con np.unique. Devuelve los códigos de cada grupo y las sumas.
+    sizes = [int(code.max()) + 1 if len(code) else 1 for code in codes]
+    combined = np.zeros(len(codes[0]), dtype=np.int64)
+    for code, size in zip(codes, sizes): combined = combined * size + code
+    cells = int(np.prod(sizes, dtype=np.float64))
+    if cells <= max(4 * len(combined), 1 << 20):
+        groups = np.flatnonzero(np.bincount(combined, minlength=cells))
+        sums = [np.bincount(combined, weights=w, minlength=cells)[groups] for w in weights]
+    else:
+        groups, inverse = np.unique(combined, return_inverse=True)
+        sums = [np.bincount(inverse.reshape(-1), weights=w, minlength=len(groups)) for w in weights]
+    return np.unravel_index(groups, sizes), sums
+
+
+def weekly_volume(columns):
+    # Series hechas por atleta, ejercicio y semana
+    if not len(columns): return {"athlete": np.empty(0, np.int32), "item": np.empty(0, np.int64), "week_start": np.empty(0, 'datetime64[D]'), "series": np.empty(0, np.int64)}
+    weeks = week_of(columns.day)
+    first_week = int(weeks.min())
+    (athlete, item_code, week), (volume,) = _grouped_sums((columns.athlete, columns.item_code, weeks - first_week), columns.series)
+    return {"athlete": athlete.astype(np.int32), "item": columns.item_ids[item_code], "week_start": week_start(week + first_week), "series": volume.astype(np.int64)}
+
+
+def completion_rate(columns, by="athlete"):
+    # Series hechas (sin contar las que exceden lo planificado) sobre series planificadas, por atleta o por atleta y ejercicio
+    planned = columns.planned
+    mask = planned > 0
+    if not mask.any(): return {"athlete": np.empty(0, np.int32), "item": np.empty(0, np.int64), "rate": np.empty(0)}
+    codes = (columns.athlete[mask],) + ((columns.item_code[mask],) if by == "item" else ())
+    keys, (done_sum, planned_sum) = _grouped_sums(codes, np.minimum(columns.series, planned)[mask], planned[mask])
+    result = {"athlete": keys[0].astype(np.int32), "rate": done_sum / planned_sum}
+    if by == "item": result["item"] = columns.item_ids[keys[1]]
+    return result
+
+
+def daily_adherence(columns, first_day=None, last_day=None):
+    # Matrices (atletas x días) de series hechas y planificadas; un día de descanso tiene 0 planificadas
+    if first_day is None: first_day = int(columns.day.min()) if len(columns) else 0
+    if last_day is None: last_day = int(columns.day.max()) if len(columns) else first_day
+    n_days, n_athletes = last_day - first_day + 1, len(columns.athletes)
+    planned = columns.planned
+    in_range = (columns.day >= first_day) & (columns.day <= last_day) & (planned > 0)
+    cell = columns.athlete[in_range].astype(np.int64) * n_days + (columns.day[in_range] - first_day)
+    done = np.bincount(cell, weights=np.minimum(columns.series, planned)[in_range], minlength=n_athletes * n_days).reshape(n_athletes, n_days)
+    weekdays = weekday_of(np.arange(first_day, last_day + 1))
+    planned_by_day = columns.daily_planned[columns.athlete_plan][:, weekdays] if n_athletes else np.zeros((0, n_days))
+    return first_day, done, planned_by_day.astype(np.float64)
+
+
+def streaks(columns, threshold=1.0, first_day=None, last_day=None):
+    # Rachas de días de entrenamiento cumplidos (hechas/planificadas >= threshold); los descansos no cortan la racha
+    _, done, planned = daily_adherence(columns, first_day, last_day)
+    training = planned > 0
+    met = training & (done >= threshold * planned)
+    if not done.size: return {"longest": np.zeros(len(columns.athletes), np.int64), "current": np.zeros(len(columns.athletes), np.int64)}
+    met_count = np.cumsum(met, axis=1)
+    index = np.broadcast_to(np.arange(done.shape[1]), done.shape)
+    # Para cada día, la posición del último día de entrenamiento incumplido (o -1)
+    last_miss = np.maximum.accumulate(np.where(training & ~met, index, -1), axis=1)
+    before_miss = np.where(last_miss >= 0, np.take_along_axis(met_count, np.maximum(last_miss, 0), axis=1), 0)
+    run = met_count - before_miss
+    return {"longest": run.max(axis=1), "current": run[:, -1]}
+
+
+def rolling_adherence(columns, window=DEFAULT_ADHERENCE_WINDOW, first_day=None, last_day=None):
+    # Adherencia de los últimos `window` días para cada día: suma móvil de hechas sobre suma móvil de planificadas
+    first_day, done, planned = daily_adherence(columns, first_day, last_day)
+    def moving_sum(matrix):
+        total = np.cumsum(matrix, axis=1)
+        total[:, window:] -= total[:, :-window].copy()
+        return total
+    planned_window = moving_sum(planned)
+    ratio = np.divide(moving_sum(done), planned_window, out=np.full(done.shape, np.nan), where=planned_window > 0)
+    days = np.arange(first_day, first_day + done.shape[1]).astype('datetime64[D]')
+    return {"days": days, "adherence": ratio}
+
+
+def summarize(columns, window=DEFAULT_ADHERENCE_WINDOW, last_day=None):
+    # Resumen por atleta, apto para JSON
+    if last_day is None: last_day = int(np.datetime64('today', 'D').astype(np.int64))
+    rates = completion_rate(columns)
+    rate_by_athlete = dict(zip(rates["athlete"].tolist(), rates["rate"].tolist()))
+    volume = np.bincount(columns.athlete, weights=columns.series, minlength=len(columns.athletes))
+    streak = streaks(columns, last_day=last_day)
+    adherence = rolling_adherence(columns, window, first_day=last_day - window + 1, last_day=last_day)["adherence"]
+    recent = adherence[:, -1] if adherence.size else np.full(len(columns.athletes), np.nan)
+    return [{"athlete": name, "series_total": int(volume[i]), "completion_rate": round(rate_by_athlete.get(i, 0.0), 4),
+             "longest_streak": int(streak["longest"][i]), "current_streak": int(streak["current"][i]),
+             f"adherence_{window}d": None if np.isnan(recent[i]) else round(float(recent[i]), 4)}
+            for i, name in enumerate(columns.athletes)]
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Volumen, cumplimiento, rachas y adherencia de uno o varios atletas.")
+    parser.add_argument("folders", nargs="*", help="Carpetas con plan.json y progress.csv (una por atleta)")
+    parser.add_argument("--atletas", help="Carpeta de atletas (atletas.json) en lugar de carpetas sueltas")
+    parser.add_argument("--cache", help="Archivo .npz con las columnas; se crea si no existe y se usa en lugar de releer los CSV")
+    parser.add_argument("--ventana", type=int, default=DEFAULT_ADHERENCE_WINDOW, help="Días de la adherencia móvil")
+    args = parser.parse_args()
+    if args.cache and os.path.exists(args.cache) and not args.folders and not args.atletas:
+        columns = ProgressColumns.load(args.cache)
+    elif args.atletas:
+        from atletas import AthleteDirectory
+        columns = ProgressColumns.from_athletes(AthleteDirectory(args.atletas))
+    else:
+        columns = ProgressColumns.from_folders(args.folders)
+        if args.cache: columns.save(args.cache)
+    for summary in summarize(columns, args.ventana):
+        print(json.dumps(summary, ensure_ascii=False))
@@ -0,0 +1,195 @@
+import base64
+import os
+import queue
+import struct
+import threading
+import tkinter as tk
+from collections import OrderedDict
+
+# --- Vista Previa Animada de Ejercicios ---
+# Los GIF de .gifs/ se asocian al ejercicio por nombre de archivo (sin extensiones .gif).
+# La lectura del archivo y el análisis de cuadros/retardos se hacen en un hilo; los
+# PhotoImage (que Tk solo permite crear en el hilo principal) se decodifican de a un
+# cuadro por ciclo ocioso y se guardan en una caché LRU acotada por cantidad de cuadros y por
+# bytes del GIF leído (base64, lo que Tk decodifica), así volver a un ejercicio ya visto no
+# vuelve a decodificar y la memoria queda limitada aunque se recorran muchos GIF sin decodificar.
+GIF_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".gifs")
+GIF_MAX_SIZE = 240
+MAX_CACHED_FRAMES = 120
+MAX_CACHED_DATA_BYTES = 8 * 1024 * 1024
+DEFAULT_FRAME_DELAY = 100
+
+_gif_index = None
+
+def gif_path_for(item_name, gif_dir=GIF_DIR):
+    global _gif_index
+    if _gif_index is None:
+        _gif_index = {}
+        if os.path.isdir(gif_dir):
+            for file_name in os.listdir(gif_dir):
+                stem = file_name
+                while stem.lower().endswith(".gif"): stem = stem[:-4]
+                if stem != file_name: _gif_index[stem.casefold()] = os.path.join(gif_dir, file_name)
+    return _gif_index.get(item_name.casefold())
+
+
+def read_gif_frames(data):
+    # Recorre los bloques del GIF sin decodificar el LZW: devuelve (retardo en ms, x, y) por cuadro
+    flags = data[10]
+    pos = 13 + (3 * 2 ** ((flags & 7) + 1) if flags & 0x80 else 0)
+    delays, delay = [], DEFAULT_FRAME_DELAY
+    while pos < len(data):
+        block = data[pos]
+        if block == 0x21:
+            label, pos = data[pos + 1], pos + 2
+            if label == 0xF9 and data[pos] >= 4: delay = struct.unpack('<H', data[pos + 2:pos + 4])[0] * 10 or DEFAULT_FRAME_DELAY
+            while pos < len(data) and data[pos]: pos += data[pos] + 1
+            pos += 1
+        elif block == 0x2C:
+            left, top = struct.unpack('<HH', data[pos + 1:pos + 5])
+            flags = data[pos + 9]
+            pos += 10 + (3 * 2 ** ((flags & 7) + 1) if flags & 0x80 else 0) + 1
+            while pos < len(data) and data[pos]: pos += data[pos] + 1
+            pos += 1
+            delays.append((max(delay, 20), left, top)); delay = DEFAULT_FRAME_DELAY
+        else: break
+    return delays
+
+
+class GifFrames:
+    __slots__ = ("path", "data", "delays", "subsample", "frames", "canvas")
+
+    def __init__(self, path):
+        self.path = path
+        self.data, self.delays, self.subsample = None, [], 1
+        self.frames = []
+        # Imagen completa acumulada mientras se decodifica: los cuadros optimizados solo traen la zona que cambia
+        self.canvas = None
+
+    def complete(self):
+        return self.data is not None and len(self.frames) >= len(self.delays)
+
+
+class GifFrameCache:
+    def __init__(self, max_frames=MAX_CACHED_FRAMES, max_data_bytes=MAX_CACHED_DATA_BYTES):
+        self.max_frames = max_frames
+        self.max_data_bytes = max_data_bytes
+        self._entries = OrderedDict()
+
+    def get(self, path):
+        entry = self._entries.get(path)
+        if entry is not None: self._entries.move_to_end(path)
+        return entry
+
+    def add(self, entry):
+        self._entries[entry.path] = entry
+        self.trim(keep=entry)
+
+    def trim(self, keep=None):
+        frames = sum(len(e.frames) for e in self._entries.values())
+        data_bytes = sum(len(e.data or b"") for e in self._entries.values())
+        for path in list(self._entries):
+            if frames <= self.max_frames and data_bytes <= self.max_data_bytes: break
+            if self._entries[path] is keep: continue
+            entry = self._entries.pop(path)
+            frames -= len(entry.frames); data_bytes -= len(entry.data or b"")
+
+
+class GifPreview(tk.Label):
+    def __init__(self, parent, cache=None, max_size=GIF_MAX_SIZE, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.cache = cache or GifFrameCache()
+        self.max_size = max_size
+        self.current = None
+        self._frame_index = 0
+        self._animation_job = None
+        self._decode_job = None
+        self._loaded = queue.Queue()
+        self._pending_loads = 0
+        self._poll_job = None
+
+    def show(self, item_name):
+        path = gif_path_for(item_name)
+        if path is None: self.clear(); return
+        if self.current is not None and self.current.path == path: return
+        self.clear()
+        entry = self.cache.get(path)
+        if entry is None:
+            entry = GifFrames(path)
+            self.cache.add(entry)
+            threading.Thread(target=self._load_in_background, args=(entry,), daemon=True).start()
+            self._pending_loads += 1
+            if self._poll_job is None: self._poll_job = self.after(30, self._poll_loaded)
+        self.current, self._frame_index = entry, 0
+        self._schedule_decode()
+        self._animate()
+
+    def clear(self):
+        for job in (self._animation_job, self._decode_job):
+            if job is not None: self.after_cancel(job)
+        self._animation_job = self._decode_job = None
+        self.current = None
+        self.config(image="")
+
+    def _load_in_background(self, entry):
+        try:
+            with open(entry.path, 'rb') as f: raw = f.read()
+            delays = read_gif_frames(raw)
+            width, height = struct.unpack('<HH', raw[6:10])
+            subsample = max(1, -(-max(width, height) // self.max_size))
+            self._loaded.put((entry, base64.b64encode(raw), delays, subsample))
+        except (OSError, IndexError, struct.error):
+            self._loaded.put((entry, None, [], 1))
+
+    def _poll_loaded(self):
+        # Los resultados del hilo se aplican aquí, en el hilo de Tk
+        self._poll_job = None
+        while True:
+            try: entry, data, delays, subsample = self._loaded.get_nowait()
+            except queue.Empty: break
+            self._pending_loads -= 1
+            entry.data, entry.delays, entry.subsample = data, delays, subsample
+            if entry is self.current: self._schedule_decode()
+        # Los bytes leídos también cuentan para el límite de la caché
+        self.cache.trim(keep=self.current)
+        if self._pending_loads: self._poll_job = self.after(30, self._poll_loaded)
+
+    def _schedule_decode(self):
+        if self._decode_job is None and self.current is not None and self.current.data and not self.current.complete():
+            self._decode_job = self.after_idle(self._decode_next_frame)
+
+    def _decode_next_frame(self):
+        self._decode_job = None
+        entry = self.current
+        if entry is None or entry.complete() or self.cache.get(entry.path) is not entry: return
+        index = len(entry.frames)
+        try:
+            partial = tk.PhotoImage(master=self, data=entry.data, format=f"gif -index {index}")
+            if entry.canvas is None:
+                entry.canvas = partial
+            else:
+                # Si Tk ya devolvió el cuadro con el tamaño lógico completo, el desplazamiento ya viene aplicado
+                _, left, top = entry.delays[index]
+                if partial.width() >= entry.canvas.width() and partial.height() >= entry.canvas.height(): left = top = 0
+                canvas = entry.canvas.copy()
+                canvas.tk.call(canvas.name, "copy", partial.name, "-to", left, top, "-compositingrule", "overlay")
+                entry.canvas = canvas
+            frame = entry.canvas.subsample(entry.subsample) if entry.subsample > 1 else entry.canvas
+        except tk.TclError:
+            # Cuadro que Tk no puede leer: se da el GIF por terminado con los cuadros obtenidos
+            entry.delays = entry.delays[:index]; entry.canvas = None; return
+        entry.frames.append(frame)
+        if entry.complete(): entry.canvas = None
+        self.cache.trim(keep=entry)
+        if len(entry.frames) == 1: self._animate()
+        self._schedule_decode()
+
+    def _animate(self):
+        if self._animation_job is not None: self.after_cancel(self._animation_job)
+        self._animation_job = None
+        entry = self.current
+        if entry is None or not entry.frames: return
+        index = self._frame_index % len(entry.frames)
+        self.config(image=entry.frames[index])
+        self._frame_index = index + 1
+        self._animation_job = self.after(entry.delays[index][0], self._animate)
@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+
+# --- Medición del Arranque ---
+# Se importa lo antes posible (en el ejecutable, desde el runtime hook pyi_rth_arranque.py)
+# y registra cuánto tarda cada fase hasta que la ventana aparece. Cuando el sistema lo
+# permite, el punto de partida es la creación del proceso, así que también cuenta el
+# trabajo del bootloader de PyInstaller antes de que Python arranque. Cada inicio agrega
+# una línea JSON al registro, para comparar el tiempo a la primera ventana entre versiones.
+PYTHON_START = time.time()
+_PERF_START = time.perf_counter()
+STARTUP_LOG_ENV = "TRAINING_STARTUP_LOG"
+STARTUP_LOG_FILE = "arranque.jsonl"
+
+
+def process_start_time():
+    # Hora (epoch) de creación del proceso, o None si no se puede obtener
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+            creation, exit_, kernel, user = (wintypes.FILETIME() for _ in range(4))
+            kernel32 = ctypes.windll.kernel32
+            if not kernel32.GetProcessTimes(kernel32.GetCurrentProcess(), ctypes.byref(creation), ctypes.byref(exit_), ctypes.byref(kernel), ctypes.byref(user)): return None
+            # FILETIME: intervalos de 100 ns desde 1601-01-01
+            return ((creation.dwHighDateTime << 32) | creation.dwLowDateTime) / 1e7 - 11644473600
+        if sys.platform.startswith("linux"):
+            # starttime se cuenta en ticks desde el arranque del sistema; se compara contra CLOCK_BOOTTIME
+            with open("/proc/self/stat") as f: start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+            age = time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf("SC_CLK_TCK")
+            return time.time() - age
+    except (OSError, ValueError, AttributeError):
+        return None
+    return None
+
+
+def startup_log_path():
+    # Por defecto solo el ejecutable congelado deja registro; en desarrollo se activa con la variable de entorno
+    path = os.environ.get(STARTUP_LOG_ENV)
+    if path: return path
+    return STARTUP_LOG_FILE if getattr(sys, "frozen", False) else None
+
+
+class StartupTimer:
+    def __init__(self):
+        self.phases = []
+        self._last = _PERF_START
+        self.window_shown = None
+        self.reported = False
+
+    def mark(self, phase):
+        # Cierra la fase actual con el nombre dado y empieza la siguiente
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def watch_first_window(self, root, then=None):
+        # La ventana cuenta como mostrada con su primer <Expose> (el sistema ya la muestra y Tk la
+        # pinta), no en la primera vuelta ociosa, que llega antes. then se llama en ese momento
+        def exposed(event):
+            root.unbind("<Expose>", binding)
+            self.first_window()
+            if then is not None: then()
+        binding = root.bind("<Expose>", exposed, add="+")
+
+    def first_window(self):
+        if self.window_shown is not None: return
+        self.mark("primera_ventana")
+        self.window_shown = time.perf_counter()
+
+    def finish(self):
+        # La interfaz quedó completa: se escribe el registro (una sola vez por proceso)
+        if self.reported: return
+        self.reported = True
+        self.report()
+
+    def summary(self):
+        process_start = process_start_time()
+        now = time.perf_counter()
+        to_window = (self.window_shown or now) - _PERF_START
+        record = {"timestamp": round(time.time(), 3), "frozen": bool(getattr(sys, "frozen", False)),
+                  "executable": sys.executable, "python_to_window_s": round(to_window, 4),
+                  "python_to_ready_s": round(now - _PERF_START, 4), "phases_s": {phase: round(seconds, 4) for phase, seconds in self.phases}}
+        if process_start is not None:
+            # Lo que pasó antes de Python: bootloader, descompresión y carga de DLLs
+            record["process_to_python_s"] = round(max(PYTHON_START - process_start, 0.0), 4)
+            record["process_to_window_s"] = round(record["process_to_python_s"] + to_window, 4)
+        if record["frozen"]:
+            try: record["build_mtime"] = round(os.path.getmtime(sys.executable))
+            except OSError: pass
+        return record
+
+    def report(self):
+        path = startup_log_path()
+        if path is None: return
+        import json
+        try:
+            with open(path, 'a', encoding='utf-8') as f: f.write(json.dumps(self.summary()) + "\n")
+        except OSError:
+            pass
+
+
+startup_timer = StartupTimer()
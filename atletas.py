@@ -0,0 +1,150 @@
+import json
+import os
+import re
+import shutil
+import unicodedata
+from almacenamiento import ARCHIVE_SUFFIX, FileStorage, JOURNAL_SUFFIX, write_atomic
+from nucleo import TrainingPlan, default_training_plan
+
+# --- Varios Atletas en un Mismo Equipo ---
+# Los planes son plantillas compartidas (plantillas/<nombre>.json) y cada atleta tiene solo
+# su progreso (<id>/progress.csv). Un único índice (atletas.json) guarda nombre y plantilla
+# de cada atleta, así que abrir la app lee ese archivo y el progreso del atleta elegido,
+# sin recorrer las carpetas de los demás. Cambiar de atleta con la misma plantilla reutiliza
+# el plan ya cargado y solo se abre otro progreso.
+ATHLETES_DIR = "atletas"
+ATHLETES_DIR_ENV = "TRAINING_ATHLETES_DIR"
+INDEX_FILE = "atletas.json"
+TEMPLATES_DIR = "plantillas"
+DEFAULT_TEMPLATE = "general"
+
+
+def read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f: return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def slugify(name):
+    # Nombre de carpeta seguro: sin tildes ni símbolos ("María José" -> "maria-jose")
+    plain = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "-", plain.lower()).strip("-") or "atleta"
+
+
+def unique_name(base, taken):
+    name, suffix = base, 2
+    while name in taken: name, suffix = f"{base}-{suffix}", suffix + 1
+    return name
+
+
+class AthleteDirectory:
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.index_file = os.path.join(root_dir, INDEX_FILE)
+        index = read_json(self.index_file) or {}
+        self.athletes = index.get("athletes", {})
+        self.last_athlete = index.get("last_athlete")
+        self._plans = {}
+
+    @classmethod
+    def open_if_present(cls, root_dir=None):
+        # Sin atletas.json la app sigue en modo de un solo usuario con plan.json y progress.csv
+        root_dir = root_dir or os.environ.get(ATHLETES_DIR_ENV) or ATHLETES_DIR
+        return cls(root_dir) if os.path.exists(os.path.join(root_dir, INDEX_FILE)) else None
+
+    def save_index(self):
+        os.makedirs(self.root_dir, exist_ok=True)
+        index = {"last_athlete": self.last_athlete, "athletes": self.athletes}
+        write_atomic(self.index_file, lambda f: json.dump(index, f, ensure_ascii=False, indent=4))
+
+    # --- Rutas ---
+    def template_file(self, template):
+        return os.path.join(self.root_dir, TEMPLATES_DIR, template + ".json")
+
+    def progress_file(self, athlete_id):
+        return os.path.join(self.root_dir, athlete_id, "progress.csv")
+
+    def templates(self):
+        templates_dir = os.path.join(self.root_dir, TEMPLATES_DIR)
+        return sorted(name[:-5] for name in os.listdir(templates_dir) if name.endswith(".json")) if os.path.isdir(templates_dir) else []
+
+    def names(self):
+        # [(id, nombre)] ordenado por nombre, para el selector
+        return sorted(((athlete_id, info["name"]) for athlete_id, info in self.athletes.items()), key=lambda entry: entry[1].casefold())
+
+    def template_of(self, athlete_id):
+        return self.athletes[athlete_id].get("template", DEFAULT_TEMPLATE)
+
+    # --- Altas ---
+    def add_template(self, template, plan_days):
+        path = self.template_file(template)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, lambda f: json.dump(plan_days, f, ensure_ascii=False, indent=4))
+
+    def add_athlete(self, name, template=DEFAULT_TEMPLATE):
+        if not os.path.exists(self.template_file(template)):
+            if template != DEFAULT_TEMPLATE: raise ValueError(f"No existe la plantilla '{template}'.")
+            # La primera vez se parte del plan.json actual (o del plan por defecto)
+            self.add_template(template, read_json("plan.json") or default_training_plan)
+        athlete_id = unique_name(slugify(name), self.athletes)
+        os.makedirs(os.path.join(self.root_dir, athlete_id), exist_ok=True)
+        self.athletes[athlete_id] = {"name": name, "template": template}
+        if self.last_athlete is None: self.last_athlete = athlete_id
+        self.save_index()
+        return athlete_id
+
+    def import_folder(self, folder, name, template=None):
+        # Trae una carpeta copiada con plan.json + progress.csv: el plan pasa a ser una plantilla
+        # (o se usa una existente) y el progreso se copia tal cual, con su diario y su archivo si los tiene
+        if template is None:
+            template = unique_name(slugify(name), self.templates())
+            self.add_template(template, read_json(os.path.join(folder, "plan.json")) or default_training_plan)
+        athlete_id = self.add_athlete(name, template)
+        for file_name in ("progress.csv", "progress.csv" + JOURNAL_SUFFIX):
+            source = os.path.join(folder, file_name)
+            if os.path.exists(source): shutil.copy2(source, os.path.join(self.root_dir, athlete_id, file_name))
+        archive = os.path.join(folder, "progress.csv" + ARCHIVE_SUFFIX)
+        if os.path.isdir(archive): shutil.copytree(archive, os.path.join(self.root_dir, athlete_id, "progress.csv" + ARCHIVE_SUFFIX))
+        return athlete_id
+
+    # --- Apertura ---
+    def open_storage(self, athlete_id):
+        # El plan_file es la plantilla compartida: editar el plan lo cambia para todos los que la usan
+        return FileStorage(self.template_file(self.template_of(athlete_id)), self.progress_file(athlete_id))
+
+    def plan_for(self, athlete_id, storage=None):
+        # Cada plantilla se lee una sola vez por proceso y se comparte entre atletas
+        template = self.template_of(athlete_id)
+        if template not in self._plans:
+            self._plans[template] = TrainingPlan.from_storage(storage or self.open_storage(athlete_id))
+        return self._plans[template]
+
+    def select(self, athlete_id):
+        if athlete_id == self.last_athlete: return
+        self.last_athlete = athlete_id
+        self.save_index()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Administra atletas y plantillas de plan.")
+    parser.add_argument("--dir", default=os.environ.get(ATHLETES_DIR_ENV) or ATHLETES_DIR)
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    add_parser = subparsers.add_parser("agregar", help="Agrega un atleta")
+    add_parser.add_argument("nombre")
+    add_parser.add_argument("--plantilla", default=DEFAULT_TEMPLATE)
+    import_parser = subparsers.add_parser("importar", help="Importa una carpeta con plan.json y progress.csv")
+    import_parser.add_argument("carpeta")
+    import_parser.add_argument("nombre")
+    import_parser.add_argument("--plantilla", help="Usar una plantilla existente en lugar del plan.json de la carpeta")
+    subparsers.add_parser("listar", help="Lista atletas y plantillas")
+    args = parser.parse_args()
+    directory = AthleteDirectory(args.dir)
+    if args.action == "agregar":
+        print(directory.add_athlete(args.nombre, args.plantilla))
+    elif args.action == "importar":
+        print(directory.import_folder(args.carpeta, args.nombre, args.plantilla))
+    else:
+        for athlete_id, name in directory.names(): print(f"{athlete_id}\t{name}\t{directory.template_of(athlete_id)}")
+        print("Plantillas:", ", ".join(directory.templates()))
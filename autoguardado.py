@@ -0,0 +1,97 @@
+import copy
+import threading
+import time
+import traceback
+
+# --- Autoguardado en Segundo Plano ---
+# La interfaz solo avisa qué cambió (series marcadas o una copia del plan) y sigue;
+# un hilo agrupa los avisos, espera a que pase AUTOSAVE_DELAY sin cambios (o como
+# máximo AUTOSAVE_MAX_DELAY desde el primero) y los escribe en el almacenamiento.
+# Así el bucle de Tk nunca espera al disco y un cierre forzado pierde a lo sumo ~2 s.
+AUTOSAVE_DELAY = 1.0
+AUTOSAVE_MAX_DELAY = 2.0
+
+
+class AutoSaver:
+    def __init__(self, storage, delay=AUTOSAVE_DELAY, max_delay=AUTOSAVE_MAX_DELAY):
+        self.storage = storage
+        self.delay = delay
+        self.max_delay = max_delay
+        self._changed = threading.Condition()
+        self._pending_series = {}
+        self._pending_plan = None
+        # Días modificados del plan pendiente (None = todos)
+        self._pending_plan_days = None
+        self._first_change = self._last_change = 0.0
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="autoguardado", daemon=True)
+        self._thread.start()
+
+    # Misma firma que storage.record_series, para que ProgressStore pueda escribir a través de aquí
+    def record_series(self, date_str, item_id, item_name, series_completed):
+        with self._changed:
+            # Varios clics sobre el mismo ejercicio se reducen a su último valor
+            self._pending_series[(date_str, item_id)] = (item_name, series_completed)
+            self._touch()
+
+    def plan_changed(self, plan, days=None):
+        snapshot = copy.deepcopy(plan)
+        with self._changed:
+            self._merge_plan_days(days)
+            self._pending_plan = snapshot
+            self._touch()
+
+    def _merge_plan_days(self, days):
+        # La copia más reciente reemplaza a la anterior, pero los días por escribir se acumulan
+        if self._pending_plan is None: self._pending_plan_days = None if days is None else set(days)
+        elif days is None or self._pending_plan_days is None: self._pending_plan_days = None
+        else: self._pending_plan_days |= set(days)
+
+    def has_pending_plan(self):
+        with self._changed: return self._pending_plan is not None
+
+    def _touch(self):
+        now = time.monotonic()
+        if not self._first_change: self._first_change = now
+        self._last_change = now
+        self._changed.notify()
+
+    def _has_pending_changes(self):
+        return bool(self._pending_series) or self._pending_plan is not None
+
+    def _run(self):
+        while True:
+            with self._changed:
+                while not self._has_pending_changes() and not self._stopping: self._changed.wait()
+                while not self._stopping:
+                    now = time.monotonic()
+                    remaining = min(self._last_change + self.delay, self._first_change + self.max_delay) - now
+                    if remaining <= 0: break
+                    self._changed.wait(remaining)
+                series, plan, plan_days = self._pending_series, self._pending_plan, self._pending_plan_days
+                self._pending_series, self._pending_plan, self._first_change = {}, None, 0.0
+                stopping = self._stopping
+            if series or plan is not None: self._write(series, plan, plan_days, retry=not stopping)
+            if stopping: return
+
+    def _write(self, series, plan, plan_days, retry):
+        try:
+            if plan is not None: self.storage.save_plan(plan, plan_days)
+            if series: self.storage.record_series_batch([(d, i, name, n) for (d, i), (name, n) in series.items()])
+        except Exception:
+            traceback.print_exc()
+            if not retry: return
+            # Se devuelven los cambios a la cola sin pisar los que llegaron mientras tanto
+            with self._changed:
+                for key, value in series.items(): self._pending_series.setdefault(key, value)
+                if plan is not None:
+                    self._merge_plan_days(plan_days)
+                    if self._pending_plan is None: self._pending_plan = plan
+                if self._has_pending_changes(): self._touch()
+
+    def stop(self):
+        # Escribe lo pendiente de inmediato y espera a que termine el hilo
+        with self._changed:
+            self._stopping = True
+            self._changed.notify()
+        self._thread.join()
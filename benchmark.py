@@ -0,0 +1,177 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from almacenamiento import FileStorage, JOURNAL_HEADER, PROGRESS_HEADER
+from nucleo import WEEKDAY_NAMES, TrainingSession, assign_item_ids, day_name_for
+
+# --- Benchmarks de Carga, Guardado y Vistas ---
+# Genera plan.json + progress.csv sintéticos a varias escalas (años de historial x ejercicios
+# por día), mide las rutas de arranque y guardado y, si hay pantalla (real o virtual con
+# pyvirtualdisplay), también show_day_plan y refresh_list_colors sobre la app de Tk real.
+# Los resultados salen en JSON y pueden compararse contra una corrida anterior con --comparar.
+DEFAULT_YEARS = [1, 5, 20]
+DEFAULT_EXERCISES = [10, 100, 500]
+DEFAULT_REPEATS = 5
+DEFAULT_TOLERANCE = 0.25
+DATA_DIR = os.path.join(tempfile.gettempdir(), "rockia_bench")
+
+
+def generate_dataset(folder, years, exercises_per_day, completion=0.8, seed=0):
+    # Los datos se reutilizan entre corridas: generar 20 años x 500 ejercicios toma su tiempo
+    plan_file, progress_file = os.path.join(folder, "plan.json"), os.path.join(folder, "progress.csv")
+    if os.path.exists(plan_file) and os.path.exists(progress_file): return plan_file, progress_file
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(seed)
+    plan = {day_name: {"focus": f"Foco sintético del {day_name}.", "activity": None, "exercises": [
+        {"name": f"{day_name} Ejercicio {i + 1}", "series": rng.randint(1, 6), "reps": "8-12", "description": "Ejercicio generado para benchmarks."}
+        for i in range(exercises_per_day)]} for day_name in WEEKDAY_NAMES}
+    assign_item_ids(plan)
+    with open(plan_file, 'w', encoding='utf-8') as f: json.dump(plan, f, indent=4, ensure_ascii=False)
+    # Mismo formato que deja una compactación: ordenado por fecha e ID, con el diario vacío
+    exercises_by_day = {day_name: sorted((ex["id"], ex["name"], ex["series"]) for ex in day_content["exercises"]) for day_name, day_content in plan.items()}
+    today = date.today()
+    day = today - timedelta(days=365 * years)
+    with open(progress_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(PROGRESS_HEADER)
+        while day <= today:
+            date_str = day.isoformat()
+            writer.writerows([date_str, item_id, name, rng.randint(1, series)] for item_id, name, series in exercises_by_day[day_name_for(day)] if rng.random() < completion)
+            day += timedelta(days=1)
+    with open(progress_file + ".journal", 'w', newline='', encoding='utf-8') as f: csv.writer(f).writerow(JOURNAL_HEADER)
+    return plan_file, progress_file
+
+
+def measure(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {"min_s": round(min(samples), 6), "median_s": round(statistics.median(samples), 6), "repeats": repeats}
+
+
+def bench_core(folder, repeats):
+    # Anexar y compactar reescriben progress.csv: se trabaja sobre una copia para que el conjunto en
+    # caché (y las referencias de --comparar) no cambien. Sin archivado automático: se mide todo el progreso
+    scratch = tempfile.mkdtemp(prefix="rockia_core_")
+    shutil.copytree(folder, scratch, dirs_exist_ok=True)
+    try:
+        storage = FileStorage(os.path.join(scratch, "plan.json"), os.path.join(scratch, "progress.csv"), archive_horizon_days=None)
+        session = TrainingSession(storage, load=False)
+        results = {"load_plan": measure(session.load_plan, repeats), "load_progress": measure(session.load_progress, repeats)}
+        today, today_name = str(date.today()), day_name_for(date.today())
+        records = [(today, item_id, name, session.plan.total_series(today_name, item_id)) for item_id, name in session.plan.items_for_day(today_name)]
+        # Lo que antes hacía save_progress (reescribir todo el CSV) ahora es anexar al diario; la reescritura queda en la compactación
+        results["save_progress"] = measure(lambda: storage.record_series_batch(records), repeats)
+        results["compact_progress"] = measure(storage.journal.compact, repeats)
+        storage.journal.close()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+
+def open_tk_root():
+    # Devuelve (root, display virtual o None); sin pantalla se intenta con pyvirtualdisplay si está instalado
+    import tkinter as tk
+    display = None
+    if not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+        try:
+            from pyvirtualdisplay import Display
+        except ImportError:
+            Display = None
+        if Display is not None: display = Display(visible=False, size=(1280, 800)); display.start()
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        if display is not None: display.stop()
+        raise
+    root.withdraw()
+    return root, display
+
+
+def bench_tk(folder, repeats):
+    import tkinter as tk
+    import calendario_entrenamiento
+    try:
+        root, display = open_tk_root()
+    except tk.TclError as e:
+        return {"tk_skipped": f"sin pantalla: {e}"}
+    cwd = os.getcwd()
+    # La app real usa el horizonte de archivado por defecto y al cerrar compacta y archiva: se
+    # trabaja sobre una copia para que el conjunto en caché (y las referencias de --comparar) no cambien
+    scratch = tempfile.mkdtemp(prefix="rockia_tk_")
+    shutil.copytree(folder, scratch, dirs_exist_ok=True)
+    os.chdir(scratch)
+    try:
+        app = calendario_entrenamiento.TrainingApp(root)
+        # La ventana del benchmark está oculta y nunca recibe <Expose>: la segunda etapa se corre a mano
+        root.update()
+        app.finish_startup()
+        today_name = day_name_for(date.today())
+        results = {"show_day_plan": measure(lambda: (app.show_day_plan(today_name), root.update_idletasks()), repeats),
+                   "refresh_list_colors": measure(lambda: (app.refresh_list_colors(), root.update_idletasks()), repeats)}
+        app.on_closing()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch, ignore_errors=True)
+        if display is not None: display.stop()
+    return results
+
+
+def run(years_list, exercises_list, repeats, data_dir, with_tk):
+    scales = []
+    for years in years_list:
+        for exercises_per_day in exercises_list:
+            folder = os.path.join(data_dir, f"y{years}_e{exercises_per_day}")
+            plan_file, progress_file = generate_dataset(folder, years, exercises_per_day)
+            print(f"{years} años x {exercises_per_day} ejercicios/día...", file=sys.stderr)
+            timings = bench_core(folder, repeats)
+            if with_tk: timings.update(bench_tk(folder, repeats))
+            scales.append({"years": years, "exercises_per_day": exercises_per_day, "progress_bytes": os.path.getsize(progress_file), "timings": timings})
+    return {"python": platform.python_version(), "platform": platform.platform(), "date": date.today().isoformat(), "scales": scales}
+
+
+def compare(results, baseline, tolerance):
+    # Mediana actual vs. la de referencia para la misma escala; devuelve las regresiones encontradas
+    reference = {(s["years"], s["exercises_per_day"]): s["timings"] for s in baseline["scales"]}
+    regressions = []
+    for scale in results["scales"]:
+        previous = reference.get((scale["years"], scale["exercises_per_day"]), {})
+        for name, timing in scale["timings"].items():
+            before = previous.get(name)
+            if not isinstance(timing, dict) or not isinstance(before, dict): continue
+            if timing["median_s"] > before["median_s"] * (1 + tolerance):
+                regressions.append(f"{name} ({scale['years']} años, {scale['exercises_per_day']} ejercicios): {before['median_s']:.4f}s -> {timing['median_s']:.4f}s")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide carga, guardado y vistas con datos sintéticos y emite JSON.")
+    parser.add_argument("--anios", type=int, nargs="+", default=DEFAULT_YEARS)
+    parser.add_argument("--ejercicios", type=int, nargs="+", default=DEFAULT_EXERCISES)
+    parser.add_argument("--repeticiones", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--datos", default=DATA_DIR, help="Carpeta donde se generan (y reutilizan) los datos sintéticos")
+    parser.add_argument("--sin-tk", action="store_true", help="Omite las mediciones de la interfaz")
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior; termina con error si hay regresiones")
+    parser.add_argument("--tolerancia", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+    results = run(args.anios, args.ejercicios, args.repeticiones, args.datos, not args.sin_tk)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f: json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f: regressions = compare(results, json.load(f), args.tolerancia)
+        for regression in regressions: print(f"Regresión: {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
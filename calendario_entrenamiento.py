@@ -1,9 +1,19 @@
+from arranque import startup_timer
+import threading
 import tkinter as tk
-from tkinter import ttk, font, messagebox, Toplevel
-import json
-import csv
-import os
+from tkinter import ttk, font, Toplevel
 from datetime import date
+from almacenamiento import open_storage
+from atletas import AthleteDirectory
+from nucleo import TrainingSession, day_name_for
+from autoguardado import AutoSaver
+from animacion_gif import GifPreview
+from lista_virtual import VirtualList
+
+def dialogs():
+    # tkinter.messagebox solo se importa la primera vez que hace falta un diálogo
+    from tkinter import messagebox
+    return messagebox
 
 # --- Paleta de Colores ---
 COLORS = {
@@ -12,62 +22,165 @@ COLORS = {
     "light_gray": "#CCCCCC", "completed_green": "#66BB6A", "circle_bg": "#4A4A4A"
 }
 
-# --- Plan de Entrenamiento por Defecto ---
-# VERSIÓN CORREGIDA con descripciones completas
-default_training_plan = {
-    "Lunes": {"focus": "Entrenamiento técnico de Muay Thai.", "activity": "Clase de Muay Thai", "exercises": []},
-    "Martes": {"focus": "Fuerza y Potencia (Striking y Brazos).", "activity": None, "exercises": [
-        {"name": "Sentadilla Goblet con Mancuerna", "series": 4, "reps": "8-10", "description": "Fundamental para la potencia de tus patadas. Sujeta una mancuerna en vertical contra tu pecho. Baja profundo manteniendo la espalda recta y sube de forma explosiva."},
-        {"name": "Remo Renegado (Renegade Row)", "series": 3, "reps": "8 p/brazo", "description": "Fortalece la espalda para jalar en el clinch y el core para la estabilidad. En posición de plancha con mancuernas, rema con un brazo sin girar las caderas."},
-        {"name": "Flexiones a Máxima Velocidad", "series": 4, "reps": "AMRAP", "description": "Desarrolla la potencia de empuje para tus puños. Baja de forma controlada y sube con la mayor velocidad posible, sin despegar las manos del suelo."},
-        {"name": "Curl de Bíceps con Mancuerna", "series": 3, "reps": "10-12", "description": "Fortalece los bíceps para la fuerza de tracción en el clinch. De pie, con una mancuerna en cada mano, flexiona los codos para llevar las pesas hacia los hombros."},
-        {"name": "Extensión de Tríceps sobre la Cabeza", "series": 3, "reps": "10-12", "description": "Añade potencia a la extensión final de tus puñetazos. Sostén una mancuerna con ambas manos sobre tu cabeza y flexiona los codos para bajarla por detrás de la nuca."}
-    ]},
-    "Miércoles": {"focus": "Ciclismo de Resistencia.", "activity": "Ruta Plana Mapocho 42k", "exercises": []},
-    "Jueves": {"focus": "Resistencia Muscular y Fuerza de Clinch.", "activity": None, "exercises": [
-        {"name": "Zancadas con Pausa", "series": 3, "reps": "10 p/pierna", "description": "Construye resistencia en las piernas. Sostén las mancuernas, haz una zancada y aguanta 2 segundos en la posición más baja antes de subir. Alterna piernas."},
-        {"name": "Press de Hombro de Rodillas", "series": 3, "reps": "12-15", "description": "Para la resistencia de los hombros al golpear. Arrodillado para proteger la espalda, empuja las mancuernas hacia arriba de forma controlada."},
-        {"name": "Remo con Banda", "series": 3, "reps": "20", "description": "Simula el agarre y jale constante del clinch. Siéntate, pasa la banda por tus pies y rema llevando los codos hacia atrás, apretando la espalda."},
-        {"name": "Fortalecimiento de Cuello (Isométricos)", "series": 2, "reps": "10-15 seg.", "description": "Coloca la palma de tu mano en tu frente y empuja suavemente con la cabeza contra la mano, sin que la cabeza se mueva. Repite en los lados y en la nuca."},
-        {"name": "Elevaciones de Mentón", "series": 3, "reps": "15-20", "description": "Acostado boca arriba en el suelo, levanta ligeramente la cabeza y lleva tu mentón hacia el pecho. Mantén la contracción por un segundo y baja lentamente. No uses impulso."},
-        {"name": "Plancha (Plank)", "series": 3, "reps": "60 seg.", "description": "Un core fuerte es la base de todo. Mantén una línea recta desde la cabeza a los talones, apretando abdomen y glúteos."},
-        {"name": "Giro Ruso (Russian Twist)", "series": 3, "reps": "20 giros", "description": "Fortalece los oblicuos para la rotación en golpes y rodillas. Sentado, inclínate hacia atrás y gira el torso de lado a lado con una mancuerna."}
-    ]},
-    "Viernes": {"focus": "Entrenamiento técnico de Muay Thai.", "activity": "Clase de Muay Thai", "exercises": []},
-    "Sábado": {"focus": "Ciclismo de Intensidad.", "activity": "Ascenso al Cerro San Cristóbal", "exercises": []},
-    "Domingo": {"focus": "Movilidad y Recuperación Activa.", "activity": "Sesión de Estiramientos y Movilidad", "exercises": []}
-}
+# --- Redibujado Agrupado ---
+# Los cambios no pintan en el momento: marcan qué hay que repintar (una función, y para la
+# lista las filas afectadas) y todo se vuelca una sola vez en la próxima vuelta ociosa de Tk.
+# Varios clics seguidos o completar todas las series terminan en un único repintado.
+class RedrawScheduler:
+    def __init__(self, widget):
+        self.widget = widget
+        # función de pintado -> filas a repintar (None si no recibe filas), en orden de llegada
+        self._dirty = {}
+        self._job = None
+
+    def mark(self, painter):
+        self._dirty.setdefault(painter, None)
+        self._schedule()
+
+    def mark_rows(self, painter, rows):
+        dirty_rows = self._dirty.get(painter) or set()
+        dirty_rows.update(rows)
+        self._dirty[painter] = dirty_rows
+        self._schedule()
+
+    def _schedule(self):
+        if self._job is None: self._job = self.widget.after_idle(self.flush)
+
+    def flush(self):
+        self._job = None
+        dirty, self._dirty = self._dirty, {}
+        for painter, rows in dirty.items():
+            if rows is None: painter()
+            else: painter(rows)
+
+    def cancel(self):
+        if self._job is not None: self.widget.after_cancel(self._job); self._job = None
+        self._dirty.clear()
 
 # --- Widget Personalizado para los Círculos de Series ---
+# Se crea una sola vez y se reconfigura con set_series al cambiar de ejercicio: los círculos
+# se toman de un conjunto reutilizable (se ocultan los que sobran) en vez de destruirse y recrearse.
 class SeriesTracker(tk.Frame):
-    def __init__(self, parent, total_series, completed_series=0, on_series_change=None, interactive=True):
+    def __init__(self, parent, total_series=0, completed_series=0, on_series_change=None, interactive=True, scheduler=None):
         super().__init__(parent, bg=COLORS["dark_blue"])
-        self.total_series = total_series
+        self.scheduler = scheduler
+        self.total_series = 0
+        self.completed_series = 0
+        self.on_series_change = None
+        self.interactive = None
+        self.series_labels = []
+        self._label_colors = []
+        tk.Label(self, text="Series:", font=("Helvetica", 10), bg=COLORS["dark_blue"], fg=COLORS["light_gray"]).pack(side=tk.LEFT, padx=(0, 10))
+        self.set_series(total_series, completed_series, on_series_change, interactive)
+
+    def set_series(self, total_series, completed_series=0, on_series_change=None, interactive=True):
+        self.on_series_change = on_series_change
+        self.completed_series = completed_series
+        while len(self.series_labels) < total_series: self._add_label(len(self.series_labels))
+        # Los círculos visibles son siempre un prefijo del conjunto, así el orden se mantiene al reempaquetar
+        for lbl in self.series_labels[total_series:self.total_series]: lbl.pack_forget()
+        for lbl in self.series_labels[self.total_series:total_series]: lbl.pack(side=tk.LEFT, padx=3)
+        if interactive != self.interactive:
+            for lbl in self.series_labels: lbl.config(cursor="hand2" if interactive else "")
+        elif interactive:
+            for lbl in self.series_labels[self.total_series:total_series]: lbl.config(cursor="hand2")
+        self.total_series, self.interactive = total_series, interactive
+        self.update_display()
+
+    def _add_label(self, index):
+        lbl = tk.Label(self, text="●", font=("Helvetica", 20), bg=COLORS["dark_blue"], fg=COLORS["circle_bg"])
+        lbl.bind("<Button-1>", lambda e: self._on_circle_click(index))
+        self.series_labels.append(lbl)
+        self._label_colors.append(COLORS["circle_bg"])
+
+    def _on_circle_click(self, index):
+        if not self.interactive or index >= self.total_series: return
+        self.set_completed(index + 1 if (index + 1) != self.completed_series else index)
+        if self.on_series_change: self.on_series_change(self.completed_series)
+
+    def set_completed(self, completed_series):
+        # Cambia solo el avance; los círculos se repintan en la próxima vuelta ociosa
         self.completed_series = completed_series
+        if self.scheduler is not None: self.scheduler.mark(self.update_display)
+        else: self.update_display()
+
+    def update_display(self):
+        # Solo se reconfiguran los círculos cuyo color cambia
+        for i in range(self.total_series):
+            color = COLORS["completed_green"] if i < self.completed_series else COLORS["circle_bg"]
+            if self._label_colors[i] != color:
+                self.series_labels[i].config(fg=color)
+                self._label_colors[i] = color
+
+# --- Variante en Canvas para Muchas Series ---
+# Con EMOM o bloques de intervalos (30-100 series) un Label por círculo no escala: aquí todos
+# los círculos son ítems de un único Canvas, el clic se resuelve por coordenadas y las filas
+# se parten cada SERIES_PER_ROW círculos. Misma interfaz (set_series, on_series_change).
+CANVAS_SERIES_THRESHOLD = 12
+SERIES_PER_ROW = 15
+CIRCLE_SIZE, CIRCLE_GAP = 18, 6
+
+class CanvasSeriesTracker(tk.Frame):
+    def __init__(self, parent, total_series=0, completed_series=0, on_series_change=None, interactive=True, scheduler=None):
+        super().__init__(parent, bg=COLORS["dark_blue"])
+        self.scheduler = scheduler
+        self.total_series = 0
+        self.completed_series = 0
+        self.on_series_change = None
+        self.interactive = interactive
+        self.circle_items = []
+        self._item_colors = []
+        tk.Label(self, text="Series:", font=("Helvetica", 10), bg=COLORS["dark_blue"], fg=COLORS["light_gray"]).pack(side=tk.LEFT, anchor=tk.N, padx=(0, 10))
+        self.canvas = tk.Canvas(self, bg=COLORS["dark_blue"], borderwidth=0, highlightthickness=0, width=0, height=0)
+        self.canvas.pack(side=tk.LEFT)
+        self.canvas.bind("<Button-1>", self._on_canvas_click)
+        self.set_series(total_series, completed_series, on_series_change, interactive)
+
+    def set_series(self, total_series, completed_series=0, on_series_change=None, interactive=True):
         self.on_series_change = on_series_change
+        self.completed_series = completed_series
         self.interactive = interactive
-        self.series_labels = []
-        self._create_widgets()
+        step = CIRCLE_SIZE + CIRCLE_GAP
+        while len(self.circle_items) < total_series:
+            row, col = divmod(len(self.circle_items), SERIES_PER_ROW)
+            x, y = CIRCLE_GAP // 2 + col * step, CIRCLE_GAP // 2 + row * step
+            self.circle_items.append(self.canvas.create_oval(x, y, x + CIRCLE_SIZE, y + CIRCLE_SIZE, fill=COLORS["circle_bg"], outline=""))
+            self._item_colors.append(COLORS["circle_bg"])
+        for item in self.circle_items[total_series:self.total_series]: self.canvas.itemconfig(item, state=tk.HIDDEN)
+        for item in self.circle_items[self.total_series:total_series]: self.canvas.itemconfig(item, state=tk.NORMAL)
+        rows, columns = -(-total_series // SERIES_PER_ROW), min(total_series, SERIES_PER_ROW)
+        self.canvas.config(width=columns * step, height=rows * step, cursor="hand2" if interactive else "")
+        self.total_series = total_series
         self.update_display()
 
-    def _create_widgets(self):
-        tk.Label(self, text="Series:", font=("Helvetica", 10), bg=COLORS["dark_blue"], fg=COLORS["light_gray"]).pack(side=tk.LEFT, padx=(0, 10))
-        for i in range(self.total_series):
-            lbl = tk.Label(self, text="●", font=("Helvetica", 20), bg=COLORS["dark_blue"], fg=COLORS["circle_bg"])
-            lbl.pack(side=tk.LEFT, padx=3)
-            if self.interactive:
-                lbl.config(cursor="hand2")
-                lbl.bind("<Button-1>", lambda e, index=i: self._on_circle_click(index))
-            self.series_labels.append(lbl)
+    def _on_canvas_click(self, event):
+        step = CIRCLE_SIZE + CIRCLE_GAP
+        col, row = int(event.x // step), int(event.y // step)
+        if col >= SERIES_PER_ROW: return
+        # Solo cuenta el clic dentro del círculo, no en el espacio entre círculos
+        center_x, center_y = col * step + step / 2, row * step + step / 2
+        if (event.x - center_x) ** 2 + (event.y - center_y) ** 2 > (CIRCLE_SIZE / 2) ** 2: return
+        self._on_circle_click(row * SERIES_PER_ROW + col)
 
     def _on_circle_click(self, index):
-        self.completed_series = index + 1 if (index + 1) != self.completed_series else index
-        self.update_display()
+        if not self.interactive or index >= self.total_series: return
+        self.set_completed(index + 1 if (index + 1) != self.completed_series else index)
         if self.on_series_change: self.on_series_change(self.completed_series)
-            
+
+    def set_completed(self, completed_series):
+        self.completed_series = completed_series
+        if self.scheduler is not None: self.scheduler.mark(self.update_display)
+        else: self.update_display()
+
     def update_display(self):
-        for i, lbl in enumerate(self.series_labels):
-            lbl.config(fg=COLORS["completed_green"] if i < self.completed_series else COLORS["circle_bg"])
+        for i in range(self.total_series):
+            color = COLORS["completed_green"] if i < self.completed_series else COLORS["circle_bg"]
+            if self._item_colors[i] != color:
+                self.canvas.itemconfig(self.circle_items[i], fill=color)
+                self._item_colors[i] = color
+
+# Cada cuánto se mira si plan.json se editó por fuera (un stat por vuelta)
+PLAN_WATCH_INTERVAL_MS = 1000
 
 # --- Clase Principal de la Aplicación ---
 class TrainingApp:
@@ -79,99 +192,268 @@ class TrainingApp:
 
         self.plan_file = "plan.json"
         self.progress_file = "progress.csv"
+        # Con atletas/atletas.json la app trabaja por atleta: plan de una plantilla compartida y progreso propio
+        self.athletes = AthleteDirectory.open_if_present()
+        if self.athletes is not None and not self.athletes.athletes: self.athletes = None
+        if self.athletes is not None:
+            self.athlete_id = self.athletes.last_athlete if self.athletes.last_athlete in self.athletes.athletes else self.athletes.names()[0][0]
+            self.storage = self.athletes.open_storage(self.athlete_id)
+        else:
+            self.storage = open_storage(self.plan_file, self.progress_file)
+        self.autosaver = AutoSaver(self.storage)
+        # Plan, progreso y consultas de avance viven en nucleo.py, sin depender de Tk
+        self.session = TrainingSession(self.storage, writer=self.autosaver, load=False)
+        self.ready, self.pending_day = False, None
+        self.daily_ratios, self.history_view = None, None
+        self.redraw = RedrawScheduler(self.root)
         
+        # --- Arranque en Dos Etapas ---
+        # Primero se pinta lo mínimo (título y botones de los días, que solo necesitan el plan)
+        # mientras el progreso se lee en un hilo; la lista, el panel de descripción y los
+        # contadores de series se construyen cuando la ventana ya se mostró (primer <Expose>).
         self.load_plan()
-        self.load_progress()
+        startup_timer.mark("plan")
+        self._progress_error = None
+        self._progress_loader = threading.Thread(target=self.load_progress, name="carga-progreso", daemon=True)
+        self._progress_loader.start()
         
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        # Otra ventana puede compartir los mismos archivos: al volver a esta se trae lo que marcó
+        self.root.bind("<FocusIn>", self.sync_progress)
 
         # --- Estilos y Fuentes ---
         self.title_font = font.Font(family="Helvetica", size=18, weight="bold")
         self.subtitle_font = font.Font(family="Helvetica", size=12)
-        self.text_font = font.Font(family="Helvetica", size=10)
-        self.reps_font = font.Font(family="Helvetica", size=12, weight="bold")
         
         style = ttk.Style()
         style.theme_use("clam")
         style.configure("TButton", padding=6, relief="flat", background=COLORS["charcoal"], foreground=COLORS["white"], font=self.subtitle_font)
         style.map("TButton", background=[('active', COLORS["old_lavender"])])
-        style.configure("TPanedwindow", background=COLORS["independence"])
         style.configure("Days.TButton", font=("Helvetica", 9), padding=(0, 6))
 
-        self.days_map = {'Monday': 'Lunes', 'Tuesday': 'Martes', 'Wednesday': 'Miércoles', 'Thursday': 'Jueves', 'Friday': 'Viernes', 'Saturday': 'Sábado', 'Sunday': 'Domingo'}
-        
-        self.create_widgets()
+        self.create_header()
+        startup_timer.mark("encabezado")
+        self._plan_watch_job = self._finish_job = None
+        startup_timer.watch_first_window(self.root, then=self.window_shown)
+
+    def window_shown(self):
+        # after(1) y no after_idle: así Tk primero termina de pintar el encabezado ya expuesto
+        self._finish_job = self.root.after(1, self.finish_startup)
+
+    def finish_startup(self):
+        self._finish_job = None
+        self._progress_loader.join()
+        if self._progress_error is not None:
+            # Sin progreso no hay interfaz que mostrar: se avisa y se cierra en vez de dejar la ventana a medias
+            dialogs().showerror("Error", f"No se pudo cargar el progreso:\n{self._progress_error}", parent=self.root)
+            self.on_closing(); return
+        startup_timer.mark("progreso")
+        self.text_font = font.Font(family="Helvetica", size=10)
+        self.reps_font = font.Font(family="Helvetica", size=12, weight="bold")
+        ttk.Style().configure("TPanedwindow", background=COLORS["independence"])
+        self.create_panels()
+        self.ready = True
+        startup_timer.mark("paneles")
+        startup_timer.finish()
+        # Un día elegido mientras se terminaba de construir la interfaz se muestra ahora
+        if self.pending_day is not None: self.show_day_plan(self.pending_day)
+        self._plan_watch_job = self.root.after(PLAN_WATCH_INTERVAL_MS, self.watch_plan)
 
     def load_plan(self):
-        try:
-            with open(self.plan_file, 'r', encoding='utf-8') as f:
-                self.training_plan = json.load(f)
-            # Bucle de migración para asegurar compatibilidad con versiones antiguas del plan.json
-            for day_name, day_content in self.training_plan.items():
-                for i, ex in enumerate(day_content.get("exercises", [])):
-                    default_ex = next((item for item in default_training_plan.get(day_name, {}).get("exercises", []) if item["name"] == ex["name"]), None)
-                    if default_ex:
-                        if "series" not in ex: self.training_plan[day_name]["exercises"][i]["series"] = default_ex["series"]
-                        if "reps" not in ex: self.training_plan[day_name]["exercises"][i]["reps"] = default_ex["reps"]
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.training_plan = default_training_plan
+        if self.athletes is not None: self.session.plan = self.athletes.plan_for(self.athlete_id, self.storage)
+        else: self.session.load_plan()
+        self.plan = self.session.plan
+        self.training_plan = self.plan.days
+        self.save_plan()
 
     def load_progress(self):
-        self.completion_status = {}
-        if not os.path.exists(self.progress_file): return
-        with open(self.progress_file, mode='r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                date_str, item_name, series_completed = row['Date'], row['Item'], int(row['SeriesCompleted'])
-                if date_str not in self.completion_status: self.completion_status[date_str] = {}
-                self.completion_status[date_str][item_name] = {"series_completed": series_completed}
+        # Solo se carga la semana actual; las fechas anteriores se paginan bajo demanda.
+        # Corre en el hilo de carga: un error se informa desde el hilo de Tk al terminar el arranque
+        try: self.progress_store = self.session.load_progress()
+        except Exception as e: self._progress_error = e
 
     def save_plan(self):
-        with open(self.plan_file, 'w', encoding='utf-8') as f:
-            json.dump(self.training_plan, f, ensure_ascii=False, indent=4)
+        # Se encola una copia del plan; el hilo de autoguardado la escribe sin bloquear la interfaz.
+        # Sin cambios no se escribe nada, y con SQLite solo se actualizan los días tocados
+        dirty_days = self.plan.take_dirty_days()
+        if not dirty_days: return
+        self.autosaver.plan_changed(self.training_plan, dirty_days)
+        if self.daily_ratios is not None: self.daily_ratios.plan_changed()
 
-    def save_progress(self):
-        with open(self.progress_file, mode='w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Date', 'Item', 'SeriesCompleted'])
-            for date_str, items in self.completion_status.items():
-                for item_name, progress in items.items():
-                    writer.writerow([date_str, item_name, progress.get("series_completed", 0)])
+    def open_history(self):
+        if self.history_view is not None and self.history_view.winfo_exists(): self.history_view.lift(); return
+        # El historial se usa poco: su módulo y el cálculo de cumplimiento se cargan al abrirlo por primera vez
+        from historial import DailyRatios, HistoryView
+        if self.daily_ratios is None: self.daily_ratios = DailyRatios(self.session)
+        first_date = self.progress_store.first_date()
+        self.history_view = HistoryView(self.root, self.daily_ratios, first_date=date.fromisoformat(first_date) if first_date else None)
 
-    def on_closing(self):
+    def sync_progress(self, event=None):
+        # Dos stat si nadie más escribió; si otra instancia marcó series se repintan la lista y el contador
+        if not self.ready or not self.progress_store.refresh(): return
+        if self.daily_ratios is not None: self.daily_ratios.progress_reloaded()
+        self.refresh_list_colors()
+        selection = self.exercise_list.curselection()
+        if self.active_tracker is not None and selection and self.current_day == day_name_for(date.today()):
+            self.active_tracker.set_completed(self.progress_store.series_completed(str(date.today()), self.visible_items[selection[0]][0]))
+
+    # --- Recarga en Caliente de plan.json ---
+    # Cada PLAN_WATCH_INTERVAL_MS se mira la huella de plan.json (un stat); solo si cambió el
+    # contenido se parsea, se compara día a día con el plan en memoria y se parchean los
+    # botones de los días, las filas de la lista y la descripción que cambiaron.
+    def watch_plan(self):
+        self._plan_watch_job = self.root.after(PLAN_WATCH_INTERVAL_MS, self.watch_plan)
+        # Con un guardado propio en cola se espera: al escribirlo se une con lo de fuera y se recarga el resultado
+        if self.autosaver.has_pending_plan(): return
+        current_day = getattr(self, 'current_day', None)
+        previous_days, previous_content = list(self.training_plan), self.training_plan.get(current_day)
+        changed = self.session.poll_plan()
+        if not changed and list(self.training_plan) == previous_days: return
         self.save_plan()
-        self.save_progress()
+        if self.daily_ratios is not None: self.daily_ratios.plan_changed()
+        if list(self.training_plan) != previous_days: self.layout_day_buttons()
+        if current_day in changed: self.patch_day_plan(previous_content)
+
+    def patch_day_plan(self, previous_content):
+        day = self.current_day
+        if day not in self.training_plan:
+            self.exercise_list.set_rows([]); self.visible_items, self.row_of_item = [], {}
+            self.clear_description()
+            self.focus_label.config(text="Selecciona un día para comenzar")
+            # Sin día elegido, como al arrancar: agregar o editar vuelven a pedir que se elija uno
+            del self.current_day
+            return
+        plan = self.training_plan[day]
+        self.focus_label.config(text=f"Foco: {plan.get('focus', 'N/A')}")
+        old_items, new_items = self.visible_items, self.plan.items_for_day(day)
+        selection = self.exercise_list.curselection()
+        selected_id = old_items[selection[0]][0] if selection else None
+        # Se insertan y quitan solo las filas de IDs que aparecieron o desaparecieron (de atrás hacia
+        # adelante, para no correr los índices pendientes); las demás, a lo sumo, cambian de texto
+        from difflib import SequenceMatcher
+        matcher = SequenceMatcher(None, [item_id for item_id, _ in old_items], [item_id for item_id, _ in new_items], autojunk=False)
+        for tag, old_start, old_end, new_start, new_end in reversed(matcher.get_opcodes()):
+            if tag == "equal": continue
+            for row in reversed(range(old_start, old_end)): self.exercise_list.delete(row)
+            for offset, (_, item_name) in enumerate(new_items[new_start:new_end]): self.exercise_list.insert(old_start + offset, item_name)
+        for row, (_, item_name) in enumerate(new_items): self.exercise_list.set_text(row, item_name)
+        self.visible_items = new_items
+        self.row_of_item = {item_id: i for i, (item_id, _) in enumerate(new_items)}
+        # Las series planificadas pueden haber cambiado: se recalculan los colores en el próximo repintado
+        if day == day_name_for(date.today()): self.refresh_list_colors()
+        if not new_items: self.clear_description("Día de descanso."); return
+        selected_row = self.row_of_item.get(selected_id)
+        if selected_row is None:
+            self.exercise_list.select_set(0)
+            self.show_exercise_description(None)
+        elif self._item_content(plan, selected_id) != self._item_content(previous_content or {}, selected_id):
+            self.exercise_list.select_set(selected_row)
+            self.show_exercise_description(None)
+
+    def _item_content(self, day_content, item_id):
+        # Lo que muestra el panel de descripción para un ítem del día (ejercicio, o actividad con su foco)
+        for exercise in day_content.get("exercises", []):
+            if exercise.get("id") == item_id: return exercise
+        return (day_content.get("activity"), day_content.get("focus")) if day_content.get("activity_id") == item_id else None
+
+    def on_closing(self):
+        # El plan y el progreso ya se guardan solos; solo se vacía lo pendiente antes de salir
+        if self._finish_job is not None: self.root.after_cancel(self._finish_job)
+        if self._plan_watch_job is not None: self.root.after_cancel(self._plan_watch_job)
+        self.redraw.cancel()
+        self._progress_loader.join()
+        self.autosaver.stop()
+        self.storage.close()
         self.root.destroy()
 
-    def create_widgets(self):
+    def create_header(self):
         self.root.grid_rowconfigure(0, weight=1); self.root.grid_columnconfigure(0, weight=1)
-        main_frame = tk.Frame(self.root, bg=COLORS["independence"], padx=20, pady=20)
+        self.main_frame = main_frame = tk.Frame(self.root, bg=COLORS["independence"], padx=20, pady=20)
         main_frame.grid(row=0, column=0, sticky="nsew")
         main_frame.grid_rowconfigure(3, weight=1); main_frame.grid_columnconfigure(0, weight=1)
         title_label = tk.Label(main_frame, text="Tu Plan de Entrenamiento", font=self.title_font, bg=COLORS["independence"], fg=COLORS["white"])
         title_label.grid(row=0, column=0, pady=(0, 20))
-        days_frame = tk.Frame(main_frame, bg=COLORS["independence"])
-        days_frame.grid(row=1, column=0, sticky="ew", pady=(0, 10))
-        for i, day in enumerate(self.training_plan.keys()):
-            days_frame.grid_columnconfigure(i, weight=1)
-            ttk.Button(days_frame, text=day, style="Days.TButton", command=lambda d=day: self.show_day_plan(d)).grid(row=0, column=i, sticky="ew", padx=2)
+        self.days_frame = tk.Frame(main_frame, bg=COLORS["independence"])
+        self.days_frame.grid(row=1, column=0, sticky="ew", pady=(0, 10))
+        self.day_buttons = {}
+        self.layout_day_buttons()
         self.focus_label = tk.Label(main_frame, text="Selecciona un día para comenzar", font=self.subtitle_font, bg=COLORS["independence"], fg=COLORS["light_gray"])
         self.focus_label.grid(row=2, column=0, pady=10)
+        if self.athletes is not None: self.create_athlete_selector(main_frame)
+
+    def layout_day_buttons(self):
+        # Crea los botones que falten, quita los de días que ya no están y los ordena como el plan
+        for day in [day for day in self.day_buttons if day not in self.training_plan]:
+            self.day_buttons.pop(day).destroy()
+        for i, day in enumerate(self.training_plan):
+            if day not in self.day_buttons:
+                self.day_buttons[day] = ttk.Button(self.days_frame, text=day, style="Days.TButton", command=lambda d=day: self.show_day_plan(d))
+            self.days_frame.grid_columnconfigure(i, weight=1)
+            self.day_buttons[day].grid(row=0, column=i, sticky="ew", padx=2)
+
+    # --- Selector de Atleta ---
+    def create_athlete_selector(self, parent):
+        selector_frame = tk.Frame(parent, bg=COLORS["independence"])
+        selector_frame.grid(row=0, column=0, sticky="e", pady=(0, 20))
+        tk.Label(selector_frame, text="Atleta:", font=self.subtitle_font, bg=COLORS["independence"], fg=COLORS["light_gray"]).pack(side=tk.LEFT, padx=(0, 5))
+        self.athlete_combo = ttk.Combobox(selector_frame, state="readonly", width=22)
+        self.athlete_combo.pack(side=tk.LEFT)
+        self.athlete_combo.bind("<<ComboboxSelected>>", lambda event: self.switch_athlete(self.athlete_entries[self.athlete_combo.current()][0]))
+        ttk.Button(selector_frame, text="+", width=2, command=self.add_athlete).pack(side=tk.LEFT, padx=(5, 0))
+        self.refresh_athlete_selector()
+
+    def refresh_athlete_selector(self):
+        self.athlete_entries = self.athletes.names()
+        self.athlete_combo["values"] = [name for _, name in self.athlete_entries]
+        self.athlete_combo.current([athlete_id for athlete_id, _ in self.athlete_entries].index(self.athlete_id))
+
+    def add_athlete(self):
+        from tkinter import simpledialog
+        name = simpledialog.askstring("Nuevo Atleta", "Nombre del atleta:", parent=self.root)
+        if not name or not name.strip(): return
+        # El nuevo atleta usa la misma plantilla que el actual
+        athlete_id = self.athletes.add_athlete(name.strip(), self.athletes.template_of(self.athlete_id))
+        self.switch_athlete(athlete_id)
+
+    def switch_athlete(self, athlete_id):
+        if athlete_id == self.athlete_id: return
+        # Se vacía lo pendiente del atleta anterior y solo se cambia el progreso; el plan de la
+        # plantilla ya cargada se reutiliza tal cual
+        self._progress_loader.join()
+        self.autosaver.stop()
+        self.storage.close()
+        self.athlete_id = athlete_id
+        self.athletes.select(athlete_id)
+        self.storage = self.athletes.open_storage(athlete_id)
+        self.autosaver = AutoSaver(self.storage)
+        plan = self.athletes.plan_for(athlete_id, self.storage)
+        self.progress_store = self.session.switch_storage(self.storage, writer=self.autosaver, plan=plan)
+        if plan is not self.plan:
+            self.plan, self.training_plan = plan, plan.days
+            self.save_plan()
+        if self.history_view is not None and self.history_view.winfo_exists(): self.history_view.destroy()
+        if self.daily_ratios is not None: self.daily_ratios.plan_changed()
+        self.refresh_athlete_selector()
+        if self.ready and hasattr(self, 'current_day'): self.show_day_plan(self.current_day)
+
+    def create_panels(self):
+        main_frame = self.main_frame
         paned_window = ttk.PanedWindow(main_frame, orient=tk.HORIZONTAL)
         paned_window.grid(row=3, column=0, sticky="nsew", pady=(10,0))
         left_panel = tk.Frame(paned_window, bg=COLORS["dark_blue"])
         paned_window.add(left_panel, weight=1)
         left_panel.grid_rowconfigure(0, weight=1); left_panel.grid_columnconfigure(0, weight=1)
-        self.exercise_listbox = tk.Listbox(left_panel, font=self.text_font, bg=COLORS["dark_blue"], fg=COLORS["white"], 
-                                           selectbackground=COLORS["wenge"], borderwidth=0, highlightthickness=0, selectforeground=COLORS["white"])
-        self.exercise_listbox.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
-        self.exercise_listbox.bind("<<ListboxSelect>>", self.show_exercise_description)
+        # Solo se dibujan las filas visibles: los días con cientos de ejercicios cambian igual de rápido
+        self.exercise_list = VirtualList(left_panel, font=self.text_font, bg=COLORS["dark_blue"], fg=COLORS["white"],
+                                         select_bg=COLORS["wenge"], on_select=self.show_exercise_description)
+        self.exercise_list.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
         button_frame = tk.Frame(left_panel, bg=COLORS["dark_blue"])
         button_frame.grid(row=1, column=0, pady=10)
         ttk.Button(button_frame, text="Completar Todo ✓", command=self.complete_all_series).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Agregar", command=self.add_exercise).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Editar", command=self.edit_exercise).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Eliminar", command=self.delete_exercise).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Historial", command=self.open_history).pack(side=tk.LEFT, padx=5)
         self.desc_panel = tk.Frame(paned_window, bg=COLORS["dark_blue"])
         paned_window.add(self.desc_panel, weight=2)
         self.desc_panel.grid_rowconfigure(2, weight=1); self.desc_panel.grid_columnconfigure(0, weight=1)
@@ -179,116 +461,151 @@ class TrainingApp:
         self.tracker_reps_frame.grid(row=0, column=0, sticky="ew", padx=15, pady=(15, 5))
         self.series_tracker_frame = tk.Frame(self.tracker_reps_frame, bg=COLORS["dark_blue"])
         self.series_tracker_frame.pack(side=tk.LEFT)
+        self.series_tracker = SeriesTracker(self.series_tracker_frame, scheduler=self.redraw)
+        self.canvas_series_tracker = CanvasSeriesTracker(self.series_tracker_frame, scheduler=self.redraw)
+        self.active_tracker = None
         self.reps_label = tk.Label(self.tracker_reps_frame, text="", font=self.reps_font, bg=COLORS["dark_blue"], fg=COLORS["wenge"])
         self.reps_label.pack(side=tk.RIGHT, padx=20)
         self.description_text = tk.Text(self.desc_panel, wrap=tk.WORD, font=self.text_font, bg=COLORS["dark_blue"], 
                                         fg=COLORS["white"], borderwidth=0, highlightthickness=0, insertbackground=COLORS["white"], height=10)
         self.description_text.grid(row=1, column=0, sticky="nsew", padx=15, pady=15)
         self.description_text.config(state=tk.DISABLED)
+        self.gif_preview = GifPreview(self.desc_panel, bg=COLORS["dark_blue"])
+        self.gif_preview.grid(row=2, column=0, pady=(0, 15))
 
     def show_day_plan(self, day):
+        if not self.ready: self.pending_day = day; return
         self.current_day = day
         plan = self.training_plan.get(day, {})
         self.focus_label.config(text=f"Foco: {plan.get('focus', 'N/A')}")
-        self.exercise_listbox.delete(0, tk.END)
-        self.reps_label.config(text="")
-        for widget in self.series_tracker_frame.winfo_children(): widget.destroy()
-        self.description_text.config(state=tk.NORMAL); self.description_text.delete("1.0", tk.END); self.description_text.config(state=tk.DISABLED)
-        items_to_show = [plan["activity"]] if plan.get("activity") else [ex["name"] for ex in plan.get("exercises", [])]
+        self.clear_description()
+        items_to_show = self.plan.items_for_day(day)
+        self.visible_items = items_to_show
+        self.row_of_item = {item_id: i for i, (item_id, _) in enumerate(items_to_show)}
+        # El color de cada fila se calcula en el modelo; la lista solo dibuja las que se ven
+        is_today, todays_progress = day == day_name_for(date.today()), self.progress_store.day(str(date.today()))
+        self.exercise_list.set_rows([item_name for _, item_name in items_to_show],
+                                    [self.row_color(item_id, todays_progress) if is_today else COLORS["white"] for item_id, _ in items_to_show])
         if not items_to_show:
-            self.description_text.config(state=tk.NORMAL); self.description_text.insert("1.0", "Día de descanso."); self.description_text.config(state=tk.DISABLED)
+            self.clear_description("Día de descanso.")
         else:
-            today_name, today_str, todays_progress = self.days_map[date.today().strftime('%A')], str(date.today()), self.completion_status.get(str(date.today()), {})
-            is_today = (self.current_day == today_name)
-            for i, item_name in enumerate(items_to_show):
-                self.exercise_listbox.insert(tk.END, item_name)
-                if is_today:
-                    series_completed = todays_progress.get(item_name, {}).get("series_completed", 0)
-                    total_series = 1
-                    ex_data = next((ex for ex in plan.get("exercises",[]) if ex["name"] == item_name), None)
-                    if ex_data: total_series = ex_data.get("series", 1)
-                    if series_completed >= total_series: self.exercise_listbox.itemconfig(i, {'fg': COLORS["completed_green"]})
-            self.exercise_listbox.select_set(0)
+            self.exercise_list.select_set(0)
             self.show_exercise_description(None)
 
+    def clear_description(self, text=""):
+        self.series_tracker.pack_forget(); self.canvas_series_tracker.pack_forget(); self.active_tracker = None
+        self.gif_preview.clear(); self.reps_label.config(text="")
+        self.description_text.config(state=tk.NORMAL); self.description_text.delete("1.0", tk.END); self.description_text.insert("1.0", text); self.description_text.config(state=tk.DISABLED)
+
     def show_exercise_description(self, event):
-        if not self.exercise_listbox.curselection(): return
-        item_name = self.exercise_listbox.get(self.exercise_listbox.curselection()[0])
+        if not self.exercise_list.curselection(): return
+        item_id, item_name = self.visible_items[self.exercise_list.curselection()[0]]
         plan_today = self.training_plan[self.current_day]
         description, total_series, reps = "", 0, ""
-        exercise_data = next((ex for ex in plan_today.get("exercises", []) if ex["name"] == item_name), None)
+        exercise_data = self.plan.find_exercise(self.current_day, item_id)
         if exercise_data:
             description, total_series, reps = exercise_data.get("description", ""), exercise_data.get("series", 0), exercise_data.get("reps", "")
-        elif item_name == plan_today.get("activity"):
+        elif item_id == plan_today.get("activity_id"):
             description, total_series = f"Actividad principal de hoy:\n\n{plan_today['focus']}", 1
         self.description_text.config(state=tk.NORMAL); self.description_text.delete("1.0", tk.END); self.description_text.insert("1.0", description); self.description_text.config(state=tk.DISABLED)
         self.reps_label.config(text=f"Reps: {reps}" if reps else "")
-        for widget in self.series_tracker_frame.winfo_children(): widget.destroy()
-        today_name = self.days_map[date.today().strftime('%A')]
+        self.gif_preview.show(item_name)
+        today_name = day_name_for(date.today())
         is_today = (self.current_day == today_name)
         if total_series > 0:
             completed_series = 0
             if is_today:
-                progress = self.completion_status.get(str(date.today()), {}).get(item_name, {})
-                completed_series = progress.get("series_completed", 0)
-            def on_series_change(new_count): self.update_series_progress(item_name, new_count)
-            tracker = SeriesTracker(self.series_tracker_frame, total_series, completed_series, on_series_change, interactive=is_today)
+                completed_series = self.progress_store.series_completed(str(date.today()), item_id)
+            def on_series_change(new_count): self.update_series_progress(item_id, item_name, new_count)
+            # Pocas series: círculos como Labels; muchas: un único Canvas
+            tracker, other = (self.canvas_series_tracker, self.series_tracker) if total_series > CANVAS_SERIES_THRESHOLD else (self.series_tracker, self.canvas_series_tracker)
+            other.pack_forget()
+            tracker.set_series(total_series, completed_series, on_series_change, interactive=is_today)
             tracker.pack()
+            self.active_tracker = tracker
+        else:
+            self.series_tracker.pack_forget(); self.canvas_series_tracker.pack_forget(); self.active_tracker = None
 
-    def update_series_progress(self, item_name, completed_count):
+    def update_series_progress(self, item_id, item_name, completed_count):
         today_str = str(date.today())
-        if today_str not in self.completion_status: self.completion_status[today_str] = {}
-        if item_name not in self.completion_status[today_str]: self.completion_status[today_str][item_name] = {}
-        self.completion_status[today_str][item_name]["series_completed"] = completed_count
-        self.refresh_list_colors()
+        self.session.record_series(today_str, item_id, item_name, completed_count)
+        # Solo cambió la fila de este ejercicio
+        row = self.row_of_item.get(item_id)
+        if row is not None: self.redraw.mark_rows(self.paint_rows, [row])
 
     def refresh_list_colors(self):
-        today_name = self.days_map[date.today().strftime('%A')]
-        if self.current_day != today_name: return
-        today_str, todays_progress = str(date.today()), self.completion_status.get(str(date.today()), {})
-        plan_today = self.training_plan[self.current_day]
-        for i in range(self.exercise_listbox.size()):
-            item_name = self.exercise_listbox.get(i)
-            series_completed = todays_progress.get(item_name, {}).get("series_completed", 0)
-            total_series = 1
-            ex_data = next((ex for ex in plan_today.get("exercises", []) if ex["name"] == item_name), None)
-            if ex_data: total_series = ex_data.get("series", 1)
-            if series_completed >= total_series: self.exercise_listbox.itemconfig(i, {'fg': COLORS["completed_green"]})
-            else: self.exercise_listbox.itemconfig(i, {'fg': COLORS["white"]})
-    
-    def complete_all_series(self):
-        if not self.exercise_listbox.curselection(): return
-        today_name = self.days_map[date.today().strftime('%A')]
-        if self.current_day != today_name: messagebox.showinfo("Información", "Solo puedes registrar el progreso para el día de hoy."); return
-        item_name = self.exercise_listbox.get(self.exercise_listbox.curselection()[0])
-        plan_today = self.training_plan[self.current_day]
-        total_series = 1
-        ex_data = next((ex for ex in plan_today.get("exercises", []) if ex["name"] == item_name), None)
-        if ex_data: total_series = ex_data.get("series", 1)
-        self.update_series_progress(item_name, total_series)
+        self.redraw.mark_rows(self.paint_rows, range(len(self.visible_items)))
+
+    def row_color(self, item_id, todays_progress):
+        return COLORS["completed_green"] if todays_progress.get(item_id, 0) >= self.plan.total_series(self.current_day, item_id) else COLORS["white"]
+
+    def paint_rows(self, rows):
+        # Un repintado pendiente puede llegar después de que una recarga quitó el día mostrado
+        if getattr(self, 'current_day', None) != day_name_for(date.today()): return
+        todays_progress = self.progress_store.day(str(date.today()))
+        for i in rows:
+            # Filas marcadas antes de cambiar de día pueden ya no existir; la lista ignora colores sin cambio
+            if i < len(self.visible_items): self.exercise_list.set_color(i, self.row_color(self.visible_items[i][0], todays_progress))
+
+    def list_row_added(self, exercise):
+        # Agregar un ejercicio inserta una fila en lugar de reconstruir la lista
+        self.visible_items.append((exercise["id"], exercise["name"]))
+        row = len(self.visible_items) - 1
+        self.row_of_item[exercise["id"]] = row
+        self.exercise_list.insert(row, exercise["name"])
+        self.paint_rows([row])
+        self.exercise_list.select_set(row)
         self.show_exercise_description(None)
 
+    def list_row_updated(self, row, exercise):
+        self.visible_items[row] = (exercise["id"], exercise["name"])
+        self.exercise_list.set_text(row, exercise["name"])
+        # Con otro número de series la fila puede pasar a completada o dejar de estarlo
+        self.paint_rows([row])
+        self.show_exercise_description(None)
+
+    def list_row_deleted(self, row):
+        del self.visible_items[row]
+        self.row_of_item = {item_id: i for i, (item_id, _) in enumerate(self.visible_items)}
+        self.exercise_list.delete(row)
+        if not self.visible_items: self.show_day_plan(self.current_day); return
+        self.exercise_list.select_set(min(row, len(self.visible_items) - 1))
+        self.show_exercise_description(None)
+
+    def complete_all_series(self):
+        if not self.exercise_list.curselection(): return
+        if self.current_day != day_name_for(date.today()): dialogs().showinfo("Información", "Solo puedes registrar el progreso para el día de hoy."); return
+        item_id, item_name = self.visible_items[self.exercise_list.curselection()[0]]
+        total_series = self.plan.total_series(self.current_day, item_id)
+        self.update_series_progress(item_id, item_name, total_series)
+        # El contador ya muestra este ejercicio: basta con llenar sus círculos, sin reconstruir el panel
+        if self.active_tracker is not None: self.active_tracker.set_completed(total_series)
+
     def add_exercise(self):
-        if not hasattr(self, 'current_day'): messagebox.showwarning("Advertencia", "Por favor, selecciona un día primero."); return
-        if self.training_plan[self.current_day].get("activity"): messagebox.showinfo("Información", "No se pueden agregar ejercicios a un día con una actividad principal."); return
+        if not hasattr(self, 'current_day'): dialogs().showwarning("Advertencia", "Por favor, selecciona un día primero."); return
+        if self.training_plan[self.current_day].get("activity"): dialogs().showinfo("Información", "No se pueden agregar ejercicios a un día con una actividad principal."); return
         self.show_editor_window(mode="add")
 
     def edit_exercise(self):
-        if not hasattr(self, 'current_day') or not self.exercise_listbox.curselection(): messagebox.showwarning("Advertencia", "Selecciona un ejercicio para editar."); return
-        item_name = self.exercise_listbox.get(self.exercise_listbox.curselection()[0])
-        if item_name == self.training_plan[self.current_day].get("activity"): messagebox.showinfo("Información", "Las actividades principales no se editan."); return
-        exercise_index = next((i for i, ex in enumerate(self.training_plan[self.current_day]["exercises"]) if ex["name"] == item_name), -1)
-        if exercise_index != -1: self.show_editor_window(mode="edit", selected_index=exercise_index)
+        if not hasattr(self, 'current_day') or not self.exercise_list.curselection(): dialogs().showwarning("Advertencia", "Selecciona un ejercicio para editar."); return
+        item_id, item_name = self.visible_items[self.exercise_list.curselection()[0]]
+        if self.plan.is_activity(self.current_day, item_id): dialogs().showinfo("Información", "Las actividades principales no se editan."); return
+        if self.plan.position_of(self.current_day, item_id) is not None: self.show_editor_window(mode="edit", item_id=item_id)
 
     def delete_exercise(self):
-        if not hasattr(self, 'current_day') or not self.exercise_listbox.curselection(): messagebox.showwarning("Advertencia", "Selecciona un ejercicio para eliminar."); return
-        item_name = self.exercise_listbox.get(self.exercise_listbox.curselection()[0])
-        if item_name == self.training_plan[self.current_day].get("activity"): messagebox.showinfo("Información", "Las actividades principales no se pueden eliminar."); return
-        if messagebox.askyesno("Confirmar Eliminación", f"¿Eliminar '{item_name}'?"):
-            self.training_plan[self.current_day]["exercises"] = [ex for ex in self.training_plan[self.current_day]["exercises"] if ex['name'] != item_name]
-            self.show_day_plan(self.current_day)
-
-    def show_editor_window(self, mode, selected_index=None):
+        if not hasattr(self, 'current_day') or not self.exercise_list.curselection(): dialogs().showwarning("Advertencia", "Selecciona un ejercicio para eliminar."); return
+        row = self.exercise_list.curselection()[0]
+        item_id, item_name = self.visible_items[row]
+        if self.plan.is_activity(self.current_day, item_id): dialogs().showinfo("Información", "Las actividades principales no se pueden eliminar."); return
+        if dialogs().askyesno("Confirmar Eliminación", f"¿Eliminar '{item_name}'?"):
+            self.plan.delete_exercise(self.current_day, item_id)
+            self.save_plan()
+            self.list_row_deleted(row)
+
+    def show_editor_window(self, mode, item_id=None):
+        # Se recuerdan el día y el ID, no la posición: una recarga de plan.json mientras el editor está
+        # abierto puede agregar o quitar ejercicios y correr las posiciones
+        day = self.current_day
         editor = Toplevel(self.root)
         editor.title(f"{'Editar' if mode == 'edit' else 'Agregar'} Ejercicio")
         editor.geometry("400x450")
@@ -306,8 +623,8 @@ class TrainingApp:
         tk.Label(editor, text="Descripción:", bg=COLORS["independence"], fg=COLORS["white"]).pack(pady=(10,0))
         desc_text = tk.Text(editor, width=50, height=8, wrap=tk.WORD, bg=COLORS["dark_blue"], fg=COLORS["white"], insertbackground=COLORS["white"])
         desc_text.pack(pady=5, padx=10)
-        if mode == "edit" and selected_index is not None:
-            exercise = self.training_plan[self.current_day]["exercises"][selected_index]
+        if mode == "edit" and item_id is not None:
+            exercise = self.plan.find_exercise(day, item_id)
             name_entry.insert(0, exercise["name"])
             series_entry.insert(0, exercise.get("series", 1))
             reps_entry.insert(0, exercise.get("reps", ""))
@@ -318,21 +635,32 @@ class TrainingApp:
                 new_series = int(series_entry.get().strip())
                 if new_series < 1: raise ValueError
             except ValueError:
-                messagebox.showerror("Error", "El número de series debe ser un número entero positivo.", parent=editor); return
+                dialogs().showerror("Error", "El número de series debe ser un número entero positivo.", parent=editor); return
             if not new_name:
-                messagebox.showerror("Error", "El nombre no puede estar vacío.", parent=editor); return
-            new_exercise = {"name": new_name, "series": new_series, "reps": new_reps, "description": new_desc}
-            if mode == "edit" and selected_index is not None:
-                self.training_plan[self.current_day]["exercises"][selected_index] = new_exercise
+                dialogs().showerror("Error", "El nombre no puede estar vacío.", parent=editor); return
+            if day not in self.training_plan:
+                dialogs().showerror("Error", f"El día '{day}' ya no está en el plan (plan.json cambió mientras editabas).", parent=editor); editor.destroy(); return
+            if mode == "edit" and item_id is not None:
+                position = self.plan.position_of(day, item_id)
+                if position is None:
+                    dialogs().showerror("Error", "El ejercicio ya no está en el plan (plan.json cambió mientras editabas).", parent=editor); editor.destroy(); return
+                exercise = self.plan.update_exercise(day, position, new_name, new_series, new_reps, new_desc)
+                self.save_plan()
+                row = self.row_of_item.get(exercise["id"]) if day == getattr(self, 'current_day', None) else None
+                if row is not None: self.list_row_updated(row, exercise)
             else:
-                self.training_plan[self.current_day]["exercises"].append(new_exercise)
-            self.show_day_plan(self.current_day)
+                exercise = self.plan.add_exercise(day, new_name, new_series, new_reps, new_desc)
+                self.save_plan()
+                if day == getattr(self, 'current_day', None): self.list_row_added(exercise)
             editor.destroy()
         save_button = ttk.Button(editor, text="Guardar", command=save_changes)
         save_button.pack(pady=10)
         self.root.wait_window(editor)
 
 if __name__ == "__main__":
+    startup_timer.mark("importaciones")
     root = tk.Tk()
+    startup_timer.mark("tk")
     app = TrainingApp(root)
+    startup_timer.mark("app")
     root.mainloop()
\ No newline at end of file
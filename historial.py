@@ -0,0 +1,200 @@
+import tkinter as tk
+from datetime import date, timedelta
+from nucleo import WEEKDAY_NAMES, day_name_for
+
+# --- Historial de Cumplimiento ---
+# Mapa de calor con una columna por semana y una fila por día, sobre todo el historial.
+# DailyRatios calcula el cumplimiento de cada día (series hechas / planificadas) por mes,
+# la primera vez que se pide, y luego lo actualiza con cada serie marcada sin recalcular
+# nada más. HistoryView dibuja en un Canvas solo las semanas visibles con un conjunto fijo
+# de rectángulos: cada semana ocupa la ranura semana % tamaño, así al desplazarse solo se
+# redibujan las semanas que entran en pantalla, por muchos años que tenga el historial.
+CELL_SIZE, CELL_GAP = 14, 3
+CELL_STEP = CELL_SIZE + CELL_GAP
+TOP_MARGIN = 18
+MIN_HISTORY_WEEKS = 53
+MONTH_NAMES = ["ene", "feb", "mar", "abr", "may", "jun", "jul", "ago", "sep", "oct", "nov", "dic"]
+# De "sin hacer" a "todo completado"; los días de descanso y futuros tienen su propio color
+HEAT_COLORS = ["#2C3D55", "#3F5E4F", "#4E7E52", "#5C9D5C", "#66BB6A"]
+REST_COLOR = "#3E4C5E"
+FUTURE_COLOR = "#34404F"
+HISTORY_BG = "#2C3D55"
+
+
+class DailyRatios:
+    def __init__(self, session):
+        self.session = session
+        self._months = {}
+        # Funciones (fecha) llamadas cuando cambia el cumplimiento de un día ya calculado; None = todos
+        self.listeners = []
+        self.plan_changed()
+        session.progress_listeners.append(self.on_series_change)
+
+    def plan_changed(self):
+        # Un cambio en el plan altera lo planificado de todos los días: se descarta lo calculado
+        plan = self.session.plan
+        self._planned = {day_name: {item_id: plan.total_series(day_name, item_id) for item_id, _ in plan.items_for_day(day_name)}
+                         for day_name in WEEKDAY_NAMES}
+        self._planned_total = {day_name: sum(items.values()) for day_name, items in self._planned.items()}
+        self._months.clear()
+        for listener in self.listeners: listener(None)
+
+    def progress_reloaded(self):
+        # Otra instancia escribió progreso: los meses se recalculan cuando se vuelvan a pedir
+        self._months.clear()
+        for listener in self.listeners: listener(None)
+
+    def _month(self, year, month):
+        key = (year, month)
+        if key not in self._months:
+            first = date(year, month, 1)
+            last = (first + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+            done = {}
+            for date_str, items in self.session.progress.history(str(first), str(last)).items():
+                planned = self._planned[day_name_for(date.fromisoformat(date_str))]
+                done[date_str] = sum(min(n, planned[item_id]) for item_id, n in items.items() if item_id in planned)
+            self._months[key] = done
+        return self._months[key]
+
+    def totals(self, day_date):
+        # (series hechas, series planificadas) del día
+        date_str = str(day_date)
+        return self._month(day_date.year, day_date.month).get(date_str, 0), self._planned_total[day_name_for(day_date)]
+
+    def ratio(self, day_date):
+        # None en días de descanso
+        done, planned = self.totals(day_date)
+        return done / planned if planned else None
+
+    def on_series_change(self, date_str, item_id, previous, series_completed):
+        month = self._months.get((int(date_str[:4]), int(date_str[5:7])))
+        if month is None: return
+        planned = self._planned[day_name_for(date.fromisoformat(date_str))].get(item_id)
+        if planned is None: return
+        month[date_str] = month.get(date_str, 0) + min(series_completed, planned) - min(previous, planned)
+        for listener in self.listeners: listener(date_str)
+
+
+class HistoryView(tk.Toplevel):
+    def __init__(self, parent, ratios, first_date=None, today=None, **kwargs):
+        super().__init__(parent, bg=HISTORY_BG, **kwargs)
+        self.title("Historial de Cumplimiento")
+        self.geometry("900x230")
+        self.ratios = ratios
+        self.today = today or date.today()
+        first_date = min(first_date or self.today, self.today - timedelta(weeks=MIN_HISTORY_WEEKS - 1))
+        self.first_monday = first_date - timedelta(days=first_date.weekday())
+        self.total_weeks = (self.today - self.first_monday).days // 7 + 1
+        self._slots = []
+        self._slot_weeks = []
+        self._render_job = None
+
+        body = tk.Frame(self, bg=HISTORY_BG)
+        body.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+        labels = tk.Canvas(body, width=28, height=TOP_MARGIN + 7 * CELL_STEP, bg=HISTORY_BG, highlightthickness=0)
+        labels.pack(side=tk.LEFT, anchor="n")
+        for weekday, day_name in enumerate(WEEKDAY_NAMES):
+            labels.create_text(24, TOP_MARGIN + weekday * CELL_STEP + CELL_SIZE // 2, text=day_name[:2], anchor="e", fill="#CCCCCC", font=("Helvetica", 8))
+        self.canvas = tk.Canvas(body, height=TOP_MARGIN + 7 * CELL_STEP, bg=HISTORY_BG, highlightthickness=0,
+                                xscrollincrement=CELL_STEP, scrollregion=(0, 0, self.total_weeks * CELL_STEP, TOP_MARGIN + 7 * CELL_STEP))
+        self.canvas.pack(side=tk.LEFT, fill=tk.X, expand=True, anchor="n")
+        scrollbar = tk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        scrollbar.pack(fill=tk.X, padx=10)
+        self.canvas.configure(xscrollcommand=lambda first, last: (scrollbar.set(first, last), self._schedule_render()))
+        footer = tk.Frame(self, bg=HISTORY_BG)
+        footer.pack(fill=tk.X, padx=10, pady=8)
+        self.status_label = tk.Label(footer, text="Haz clic en un día para ver su detalle.", bg=HISTORY_BG, fg="#CCCCCC", anchor="w")
+        self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        tk.Button(footer, text="Hoy", command=self.scroll_to_today).pack(side=tk.RIGHT)
+
+        self.canvas.bind("<Configure>", lambda event: self._schedule_render())
+        self.canvas.bind("<Button-1>", self._on_click)
+        # Rueda del ratón: una semana por paso (Windows/macOS envían delta, X11 los botones 4 y 5)
+        self.canvas.bind("<MouseWheel>", lambda event: self.canvas.xview_scroll(-1 if event.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda event: self.canvas.xview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.canvas.xview_scroll(1, "units"))
+        self.ratios.listeners.append(self._on_day_changed)
+        self.bind("<Destroy>", self._on_destroy)
+        self.scroll_to_today()
+
+    def scroll_to_today(self):
+        self.canvas.xview_moveto(1.0)
+        self._schedule_render()
+
+    def _schedule_render(self):
+        # Varios desplazamientos seguidos se resuelven en un único redibujado
+        if self._render_job is None: self._render_job = self.after_idle(self._render)
+
+    def _visible_weeks(self):
+        first = max(0, int(self.canvas.canvasx(0) // CELL_STEP))
+        count = self.canvas.winfo_width() // CELL_STEP + 2
+        return range(first, min(first + count, self.total_weeks))
+
+    def _ensure_slots(self, count):
+        if count <= len(self._slots): return
+        # Con más ranuras cambia la ranura de cada semana: se ocultan todas y se redibuja lo visible
+        for cells, month_label in self._slots:
+            for item in (*cells, month_label): self.canvas.itemconfigure(item, state=tk.HIDDEN)
+        while len(self._slots) < count:
+            cells = [self.canvas.create_rectangle(0, 0, 0, 0, width=0, state=tk.HIDDEN) for _ in range(7)]
+            month_label = self.canvas.create_text(0, 0, anchor="sw", fill="#CCCCCC", font=("Helvetica", 8), state=tk.HIDDEN)
+            self._slots.append((cells, month_label))
+        self._slot_weeks = [None] * len(self._slots)
+
+    def _render(self):
+        self._render_job = None
+        weeks = self._visible_weeks()
+        self._ensure_slots(len(weeks))
+        for week in weeks:
+            slot = week % len(self._slots)
+            if self._slot_weeks[slot] != week: self._draw_week(slot, week)
+
+    def _draw_week(self, slot, week):
+        cells, month_label = self._slots[slot]
+        monday = self.first_monday + timedelta(weeks=week)
+        x = week * CELL_STEP
+        for weekday, cell in enumerate(cells):
+            day_date = monday + timedelta(days=weekday)
+            y = TOP_MARGIN + weekday * CELL_STEP
+            self.canvas.coords(cell, x, y, x + CELL_SIZE, y + CELL_SIZE)
+            self.canvas.itemconfigure(cell, fill=self._color_for(day_date), state=tk.NORMAL)
+        # El mes se rotula en la semana que contiene su día 1
+        sunday = monday + timedelta(days=6)
+        if sunday.day <= 7:
+            text = MONTH_NAMES[sunday.month - 1] + (f" {sunday.year}" if sunday.month == 1 else "")
+            self.canvas.coords(month_label, x, TOP_MARGIN - 3)
+            self.canvas.itemconfigure(month_label, text=text, state=tk.NORMAL)
+        else:
+            self.canvas.itemconfigure(month_label, state=tk.HIDDEN)
+        self._slot_weeks[slot] = week
+
+    def _color_for(self, day_date):
+        if day_date > self.today: return FUTURE_COLOR
+        ratio = self.ratios.ratio(day_date)
+        if ratio is None: return REST_COLOR
+        if ratio <= 0: return HEAT_COLORS[0]
+        return HEAT_COLORS[min(len(HEAT_COLORS) - 1, 1 + int(ratio * (len(HEAT_COLORS) - 2)))]
+
+    def _on_day_changed(self, date_str):
+        if date_str is None:
+            self._slot_weeks = [None] * len(self._slots); self._schedule_render(); return
+        # Solo se redibuja la semana del día modificado, y solo si está en pantalla
+        week = (date.fromisoformat(date_str) - self.first_monday).days // 7
+        if self._slots and self._slot_weeks[week % len(self._slots)] == week:
+            self._slot_weeks[week % len(self._slots)] = None
+            self._schedule_render()
+
+    def _on_click(self, event):
+        week = int(self.canvas.canvasx(event.x) // CELL_STEP)
+        weekday = int((event.y - TOP_MARGIN) // CELL_STEP)
+        if not 0 <= week < self.total_weeks or not 0 <= weekday < 7: return
+        day_date = self.first_monday + timedelta(weeks=week, days=weekday)
+        if day_date > self.today: return
+        done, planned = self.ratios.totals(day_date)
+        detail = f"{done}/{planned} series ({done / planned:.0%})" if planned else "Día de descanso"
+        self.status_label.config(text=f"{day_name_for(day_date)} {day_date}: {detail}")
+
+    def _on_destroy(self, event):
+        if event.widget is not self: return
+        if self._render_job is not None: self.after_cancel(self._render_job); self._render_job = None
+        if self._on_day_changed in self.ratios.listeners: self.ratios.listeners.remove(self._on_day_changed)
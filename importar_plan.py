@@ -0,0 +1,151 @@
+import csv
+import json
+import os
+import sys
+import unicodedata
+from functools import lru_cache
+from almacenamiento import write_atomic
+from atletas import slugify
+from nucleo import WEEKDAY_NAMES, assign_item_ids
+
+# --- Importador de Planes en CSV ---
+# Lee planes planos como Plan_entrenamiento.csv (Day, Type, Name, Series, Target, Description)
+# y los convierte al modelo de plan.json: Type=Activity pasa a ser la actividad principal del
+# día (con Description como foco) y Target pasa a `reps`. Un mismo archivo puede traer varios
+# programas si tiene una columna Program; sin ella, el archivo completo es un programa con el
+# nombre del archivo. Las filas se leen de a una y cada programa se entrega apenas termina su
+# bloque, así que en memoria solo está el programa en curso aunque el catálogo sea enorme.
+# Las filas inválidas no detienen la importación: se omiten y se informan con su línea.
+REQUIRED_COLUMNS = ["Day", "Type", "Name", "Series", "Target", "Description"]
+PROGRAM_COLUMN = "Program"
+FOCUS_COLUMN = "Focus"
+ACTIVITY_TYPES = {"activity", "actividad"}
+EXERCISE_TYPES = {"exercise", "ejercicio"}
+
+
+@lru_cache(maxsize=1024)
+def _plain(text):
+    # Los días y tipos se repiten en cada fila: se normalizan una vez por valor distinto
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").strip().casefold()
+
+# "miercoles", "MIÉRCOLES" y "Miércoles" se aceptan igual
+DAY_NAMES = {_plain(day_name): day_name for day_name in WEEKDAY_NAMES}
+
+
+class PlanImportError(Exception):
+    pass
+
+
+def empty_plan():
+    return {day_name: {"focus": "", "activity": None, "exercises": []} for day_name in WEEKDAY_NAMES}
+
+
+def iter_programs(csv_file, errors, default_program=None):
+    # Genera (programa, plan) en orden; los errores de fila se agregan a `errors` como (línea, mensaje)
+    default_program = default_program or os.path.splitext(os.path.basename(csv_file))[0]
+    with open(csv_file, mode='r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None: raise PlanImportError(f"{csv_file}: el archivo está vacío.")
+        columns = {name.strip(): position for position, name in enumerate(header)}
+        missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+        if missing: raise PlanImportError(f"{csv_file}: faltan las columnas {', '.join(missing)}.")
+        day_col, type_col, name_col, series_col, target_col, desc_col = (columns[name] for name in REQUIRED_COLUMNS)
+        program_col, focus_col = columns.get(PROGRAM_COLUMN), columns.get(FOCUS_COLUMN)
+        width = max(columns.values()) + 1
+        finished, program, plan = set(), None, None
+        for row in reader:
+            line = reader.line_num
+            if not any(field.strip() for field in row): continue
+            if len(row) < width: errors.append((line, f"se esperaban {width} columnas y hay {len(row)}.")); continue
+            row_program = row[program_col].strip() if program_col is not None else default_program
+            if not row_program: errors.append((line, "la columna Program está vacía.")); continue
+            if row_program != program:
+                if row_program in finished: errors.append((line, f"el programa '{row_program}' aparece en bloques separados; se omite la fila.")); continue
+                if plan is not None:
+                    finished.add(program)
+                    yield program, _finish(plan)
+                program, plan = row_program, empty_plan()
+            error = _add_row(plan, row[day_col], row[type_col], row[name_col], row[series_col], row[target_col], row[desc_col],
+                             row[focus_col] if focus_col is not None else "")
+            if error: errors.append((line, error))
+        if plan is not None: yield program, _finish(plan)
+
+
+def _add_row(plan, day, item_type, name, series, target, description, focus):
+    # Devuelve el mensaje de error, o None si la fila se agregó
+    day_name = DAY_NAMES.get(_plain(day))
+    if day_name is None: return f"día desconocido '{day}'."
+    name, kind = name.strip(), _plain(item_type)
+    if not name: return "el nombre está vacío."
+    day_content = plan[day_name]
+    if focus.strip(): day_content["focus"] = focus.strip()
+    if kind in ACTIVITY_TYPES:
+        if day_content["activity"]: return f"{day_name} ya tiene la actividad '{day_content['activity']}'."
+        if day_content["exercises"]: return f"{day_name} ya tiene ejercicios; un día con actividad principal no los muestra."
+        day_content["activity"] = name
+        if description.strip() and not focus.strip(): day_content["focus"] = description.strip()
+        return None
+    if kind not in EXERCISE_TYPES: return f"tipo desconocido '{item_type.strip()}' (se espera Activity o Exercise)."
+    if day_content["activity"]: return f"{day_name} tiene la actividad '{day_content['activity']}'; un día con actividad principal no muestra ejercicios."
+    try:
+        series_count = int(series.strip())
+        if series_count < 1: raise ValueError
+    except ValueError:
+        return f"series inválidas '{series}' (se espera un entero positivo)."
+    day_content["exercises"].append({"name": name, "series": series_count, "reps": target.strip(), "description": description.strip()})
+    return None
+
+
+def _finish(plan):
+    assign_item_ids(plan)
+    return plan
+
+
+def import_catalogs(csv_files, save_program, report=None):
+    # save_program(programa, plan) recibe cada programa válido; devuelve (programas, filas con error)
+    report = report or (lambda csv_file, line, message: print(f"{csv_file}:{line}: {message}", file=sys.stderr))
+    programs = error_count = 0
+    for csv_file in csv_files:
+        errors = []
+        try:
+            for program, plan in iter_programs(csv_file, errors):
+                save_program(program, plan); programs += 1
+                for line, message in errors: report(csv_file, line, message)
+                error_count += len(errors); errors.clear()
+        except (PlanImportError, OSError, UnicodeDecodeError, csv.Error) as e:
+            report(csv_file, 0, str(e)); error_count += 1
+        for line, message in errors: report(csv_file, line, message)
+        error_count += len(errors)
+    return programs, error_count
+
+
+def save_to_folder(folder):
+    os.makedirs(folder, exist_ok=True)
+    def save_program(program, plan):
+        write_atomic(os.path.join(folder, slugify(program) + ".json"), lambda f: json.dump(plan, f, ensure_ascii=False, indent=4))
+    return save_program
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Importa planes en CSV (Day, Type, Name, Series, Target, Description) al formato de plan.json.")
+    parser.add_argument("archivos", nargs="+")
+    destination = parser.add_mutually_exclusive_group()
+    destination.add_argument("--salida", default="planes", help="Carpeta donde escribir un <programa>.json por programa")
+    destination.add_argument("--plan", help="Escribir el único programa importado en este plan.json")
+    destination.add_argument("--atletas", help="Guardar cada programa como plantilla en esta carpeta de atletas")
+    args = parser.parse_args()
+    if args.plan:
+        imported = []
+        programs, errors = import_catalogs(args.archivos, lambda program, plan: imported.append(plan))
+        if programs != 1: sys.exit(f"--plan requiere exactamente un programa y se importaron {programs}.")
+        write_atomic(args.plan, lambda f: json.dump(imported[0], f, ensure_ascii=False, indent=4))
+    elif args.atletas:
+        from atletas import AthleteDirectory
+        directory = AthleteDirectory(args.atletas)
+        programs, errors = import_catalogs(args.archivos, lambda program, plan: directory.add_template(slugify(program), plan))
+    else:
+        programs, errors = import_catalogs(args.archivos, save_to_folder(args.salida))
+    print(f"{programs} programas importados, {errors} filas con errores.")
+    sys.exit(1 if errors else 0)
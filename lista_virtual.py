@@ -0,0 +1,156 @@
+import tkinter as tk
+
+# --- Lista Virtual de Ejercicios ---
+# Reemplaza al Listbox para días con cientos de ejercicios. El modelo (texto y color de cada
+# fila, selección) vive en listas de Python y en el Canvas solo existen las filas visibles:
+# un conjunto fijo de ranuras donde la fila N ocupa la ranura N % tamaño. Cada ranura recuerda
+# qué pintó, así que cambiar de día, desplazarse o marcar una fila solo reconfigura las ranuras
+# cuyo contenido cambió, sin importar cuántas filas tenga el día.
+ROW_PADDING = 6
+TEXT_MARGIN = 8
+
+
+class VirtualList(tk.Frame):
+    def __init__(self, parent, font, bg, fg, select_bg, on_select=None, **kwargs):
+        super().__init__(parent, bg=bg, **kwargs)
+        self.font, self.bg, self.fg, self.select_bg = font, bg, fg, select_bg
+        self.on_select = on_select
+        self.row_height = font.metrics("linespace") + ROW_PADDING
+        self.rows, self.colors = [], []
+        self.selected = None
+        self._slots = []
+        # Lo que muestra cada ranura: (fila, texto, color, seleccionada, ancho) o None si está oculta
+        self._slot_state = []
+        self._render_job = None
+
+        self.grid_rowconfigure(0, weight=1); self.grid_columnconfigure(0, weight=1)
+        self.canvas = tk.Canvas(self, bg=bg, borderwidth=0, highlightthickness=0, yscrollincrement=self.row_height)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.canvas.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.canvas.configure(yscrollcommand=lambda first, last: (scrollbar.set(first, last), self._schedule_render()))
+        self.canvas.bind("<Configure>", lambda event: self._schedule_render())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<Up>", lambda event: self._move_selection(-1, event))
+        self.canvas.bind("<Down>", lambda event: self._move_selection(1, event))
+        # Rueda del ratón: Windows/macOS envían delta, X11 los botones 4 y 5
+        self.canvas.bind("<MouseWheel>", lambda event: self.canvas.yview_scroll(-3 if event.delta > 0 else 3, "units"))
+        self.canvas.bind("<Button-4>", lambda event: self.canvas.yview_scroll(-3, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.canvas.yview_scroll(3, "units"))
+        self.bind("<Destroy>", self._on_destroy)
+
+    # --- Modelo ---
+    def set_rows(self, rows, colors=None):
+        # Cambiar de día solo reemplaza el modelo y vuelve arriba; se repinta lo visible
+        self.rows = list(rows)
+        self.colors = list(colors) if colors is not None else [self.fg] * len(self.rows)
+        self.selected = None
+        self._update_scrollregion()
+        self.canvas.yview_moveto(0)
+        self._schedule_render()
+
+    def insert(self, index, text, color=None):
+        index = len(self.rows) if index == tk.END else index
+        self.rows.insert(index, text)
+        self.colors.insert(index, color or self.fg)
+        if self.selected is not None and self.selected >= index: self.selected += 1
+        self._update_scrollregion()
+        self._schedule_render()
+        return index
+
+    def delete(self, index):
+        del self.rows[index], self.colors[index]
+        if self.selected == index: self.selected = None
+        elif self.selected is not None and self.selected > index: self.selected -= 1
+        self._update_scrollregion()
+        self._schedule_render()
+
+    def set_text(self, index, text):
+        if self.rows[index] != text: self.rows[index] = text; self._schedule_render()
+
+    def set_color(self, index, color):
+        if self.colors[index] != color: self.colors[index] = color; self._schedule_render()
+
+    def size(self):
+        return len(self.rows)
+
+    # --- Selección (misma forma que en Listbox) ---
+    def curselection(self):
+        return (self.selected,) if self.selected is not None else ()
+
+    def select_set(self, index):
+        if not 0 <= index < len(self.rows): return
+        self.selected = index
+        self.see(index)
+        self._schedule_render()
+
+    def selection_clear(self):
+        self.selected = None
+        self._schedule_render()
+
+    def see(self, index):
+        total_height = len(self.rows) * self.row_height
+        if not total_height: return
+        top, height = self.canvas.canvasy(0), self.canvas.winfo_height()
+        y = index * self.row_height
+        if y < top: self.canvas.yview_moveto(y / total_height)
+        elif y + self.row_height > top + height: self.canvas.yview_moveto(max(0, y + self.row_height - height) / total_height)
+
+    def _on_click(self, event):
+        self.canvas.focus_set()
+        row = int(self.canvas.canvasy(event.y) // self.row_height)
+        if 0 <= row < len(self.rows): self._select_and_notify(row, event)
+
+    def _move_selection(self, step, event):
+        if not self.rows: return
+        row = 0 if self.selected is None else min(max(self.selected + step, 0), len(self.rows) - 1)
+        if row != self.selected: self._select_and_notify(row, event)
+
+    def _select_and_notify(self, row, event):
+        self.select_set(row)
+        if self.on_select: self.on_select(event)
+
+    # --- Dibujo ---
+    def _update_scrollregion(self):
+        self.canvas.configure(scrollregion=(0, 0, 0, len(self.rows) * self.row_height))
+
+    def _schedule_render(self):
+        # Varios cambios seguidos se resuelven en un único repintado
+        if self._render_job is None: self._render_job = self.after_idle(self._render)
+
+    def _visible_rows(self):
+        first = max(0, int(self.canvas.canvasy(0) // self.row_height))
+        count = self.canvas.winfo_height() // self.row_height + 2
+        return range(first, min(first + count, len(self.rows)))
+
+    def _render(self):
+        self._render_job = None
+        rows = self._visible_rows()
+        while len(self._slots) < len(rows):
+            background = self.canvas.create_rectangle(0, 0, 0, 0, width=0, state=tk.HIDDEN)
+            text = self.canvas.create_text(0, 0, anchor="w", font=self.font, state=tk.HIDDEN)
+            self._slots.append((background, text)); self._slot_state.append(None)
+        width, used = self.canvas.winfo_width(), set()
+        for row in rows:
+            slot = row % len(self._slots)
+            used.add(slot)
+            state = (row, self.rows[row], self.colors[row], row == self.selected, width)
+            if self._slot_state[slot] != state: self._draw(slot, state)
+        for slot, state in enumerate(self._slot_state):
+            if state is not None and slot not in used:
+                for item in self._slots[slot]: self.canvas.itemconfigure(item, state=tk.HIDDEN)
+                self._slot_state[slot] = None
+
+    def _draw(self, slot, state):
+        row, text, color, selected, width = state
+        background, label = self._slots[slot]
+        y = row * self.row_height
+        self.canvas.coords(background, 0, y, width, y + self.row_height)
+        self.canvas.itemconfigure(background, fill=self.select_bg if selected else self.bg, state=tk.NORMAL)
+        self.canvas.coords(label, TEXT_MARGIN, y + self.row_height // 2)
+        self.canvas.itemconfigure(label, text=text, fill=color, state=tk.NORMAL)
+        self._slot_state[slot] = state
+
+    def _on_destroy(self, event):
+        if event.widget is self and self._render_job is not None:
+            self.after_cancel(self._render_job); self._render_job = None
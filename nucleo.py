@@ -0,0 +1,283 @@
+import copy
+import json
+import os
+from datetime import date
+from almacenamiento import FileStorage, file_progress_schema
+from progreso import ProgressStore, item_id_for
+
+# --- Plan de Entrenamiento por Defecto ---
+# VERSIÓN CORREGIDA con descripciones completas
+default_training_plan = {
+    "Lunes": {"focus": "Entrenamiento técnico de Muay Thai.", "activity": "Clase de Muay Thai", "exercises": []},
+    "Martes": {"focus": "Fuerza y Potencia (Striking y Brazos).", "activity": None, "exercises": [
+        {"name": "Sentadilla Goblet con Mancuerna", "series": 4, "reps": "8-10", "description": "Fundamental para la potencia de tus patadas. Sujeta una mancuerna en vertical contra tu pecho. Baja profundo manteniendo la espalda recta y sube de forma explosiva."},
+        {"name": "Remo Renegado (Renegade Row)", "series": 3, "reps": "8 p/brazo", "description": "Fortalece la espalda para jalar en el clinch y el core para la estabilidad. En posición de plancha con mancuernas, rema con un brazo sin girar las caderas."},
+        {"name": "Flexiones a Máxima Velocidad", "series": 4, "reps": "AMRAP", "description": "Desarrolla la potencia de empuje para tus puños. Baja de forma controlada y sube con la mayor velocidad posible, sin despegar las manos del suelo."},
+        {"name": "Curl de Bíceps con Mancuerna", "series": 3, "reps": "10-12", "description": "Fortalece los bíceps para la fuerza de tracción en el clinch. De pie, con una mancuerna en cada mano, flexiona los codos para llevar las pesas hacia los hombros."},
+        {"name": "Extensión de Tríceps sobre la Cabeza", "series": 3, "reps": "10-12", "description": "Añade potencia a la extensión final de tus puñetazos. Sostén una mancuerna con ambas manos sobre tu cabeza y flexiona los codos para bajarla por detrás de la nuca."}
+    ]},
+    "Miércoles": {"focus": "Ciclismo de Resistencia.", "activity": "Ruta Plana Mapocho 42k", "exercises": []},
+    "Jueves": {"focus": "Resistencia Muscular y Fuerza de Clinch.", "activity": None, "exercises": [
+        {"name": "Zancadas con Pausa", "series": 3, "reps": "10 p/pierna", "description": "Construye resistencia en las piernas. Sostén las mancuernas, haz una zancada y aguanta 2 segundos en la posición más baja antes de subir. Alterna piernas."},
+        {"name": "Press de Hombro de Rodillas", "series": 3, "reps": "12-15", "description": "Para la resistencia de los hombros al golpear. Arrodillado para proteger la espalda, empuja las mancuernas hacia arriba de forma controlada."},
+        {"name": "Remo con Banda", "series": 3, "reps": "20", "description": "Simula el agarre y jale constante del clinch. Siéntate, pasa la banda por tus pies y rema llevando los codos hacia atrás, apretando la espalda."},
+        {"name": "Fortalecimiento de Cuello (Isométricos)", "series": 2, "reps": "10-15 seg.", "description": "Coloca la palma de tu mano en tu frente y empuja suavemente con la cabeza contra la mano, sin que la cabeza se mueva. Repite en los lados y en la nuca."},
+        {"name": "Elevaciones de Mentón", "series": 3, "reps": "15-20", "description": "Acostado boca arriba en el suelo, levanta ligeramente la cabeza y lleva tu mentón hacia el pecho. Mantén la contracción por un segundo y baja lentamente. No uses impulso."},
+        {"name": "Plancha (Plank)", "series": 3, "reps": "60 seg.", "description": "Un core fuerte es la base de todo. Mantén una línea recta desde la cabeza a los talones, apretando abdomen y glúteos."},
+        {"name": "Giro Ruso (Russian Twist)", "series": 3, "reps": "20 giros", "description": "Fortalece los oblicuos para la rotación en golpes y rodillas. Sentado, inclínate hacia atrás y gira el torso de lado a lado con una mancuerna."}
+    ]},
+    "Viernes": {"focus": "Entrenamiento técnico de Muay Thai.", "activity": "Clase de Muay Thai", "exercises": []},
+    "Sábado": {"focus": "Ciclismo de Intensidad.", "activity": "Ascenso al Cerro San Cristóbal", "exercises": []},
+    "Domingo": {"focus": "Movilidad y Recuperación Activa.", "activity": "Sesión de Estiramientos y Movilidad", "exercises": []}
+}
+
+# --- Utilidades del Plan ---
+WEEKDAY_NAMES = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+
+def day_name_for(day_date):
+    # Independiente del locale, a diferencia de strftime('%A')
+    return WEEKDAY_NAMES[day_date.weekday()]
+
+def index_exercises(day_content):
+    # ID del ejercicio -> posición en la lista del día
+    return {ex["id"]: position for position, ex in enumerate(day_content.get("exercises", []))}
+
+def plan_item_ids(plan):
+    ids = {ex["id"] for day_content in plan.values() for ex in day_content.get("exercises", []) if "id" in ex}
+    return ids | {day_content["activity_id"] for day_content in plan.values() if "activity_id" in day_content}
+
+def assign_item_ids(plan):
+    # Los plan.json antiguos no traen IDs: se asignan una vez y quedan guardados con el plan
+    taken = plan_item_ids(plan)
+    assigned = 0
+    for day_content in plan.values():
+        if day_content.get("activity") and "activity_id" not in day_content:
+            day_content["activity_id"] = item_id_for(day_content["activity"], taken); taken.add(day_content["activity_id"]); assigned += 1
+        for ex in day_content.get("exercises", []):
+            if "id" not in ex: ex["id"] = item_id_for(ex["name"], taken); taken.add(ex["id"]); assigned += 1
+    return assigned
+
+def migrate_plan(plan):
+    # Bucle de migración para asegurar compatibilidad con versiones antiguas del plan.json
+    default_index = {day_name: {ex["name"]: ex for ex in reversed(day_content["exercises"])} for day_name, day_content in default_training_plan.items()}
+    for day_name, day_content in plan.items():
+        for ex in day_content.get("exercises", []):
+            default_ex = default_index.get(day_name, {}).get(ex["name"])
+            if default_ex:
+                if "series" not in ex: ex["series"] = default_ex["series"]
+                if "reps" not in ex: ex["reps"] = default_ex["reps"]
+
+
+# --- Modelo del Plan ---
+# Envuelve el dict de plan.json (self.days) con un índice por día ID -> posición que se
+# mantiene al agregar, editar o eliminar, para que toda búsqueda sea de tiempo constante.
+# Cada cambio marca su día como pendiente (dirty_days): guardar un plan sin cambios no
+# escribe nada y el almacenamiento puede escribir solo los días tocados.
+class TrainingPlan:
+    def __init__(self, days):
+        self.days = days
+        self.modified = assign_item_ids(days) > 0
+        self.build_index()
+
+    @property
+    def modified(self):
+        return bool(self.dirty_days)
+
+    @modified.setter
+    def modified(self, value):
+        self.dirty_days = set(self.days) if value else set()
+
+    def take_dirty_days(self):
+        # Devuelve los días con cambios sin guardar y los da por guardados
+        dirty_days, self.dirty_days = self.dirty_days, set()
+        return dirty_days
+
+    @classmethod
+    def from_storage(cls, storage):
+        days = storage.load_plan()
+        if days is None:
+            plan = cls(copy.deepcopy(default_training_plan)); plan.modified = True
+            return plan
+        migrate_plan(days)
+        return cls(days)
+
+    def build_index(self):
+        self.exercise_index = {day_name: index_exercises(day_content) for day_name, day_content in self.days.items()}
+
+    def find_exercise(self, day, item_id):
+        position = self.exercise_index.get(day, {}).get(item_id)
+        return self.days[day]["exercises"][position] if position is not None else None
+
+    def position_of(self, day, item_id):
+        return self.exercise_index.get(day, {}).get(item_id)
+
+    def is_activity(self, day, item_id):
+        day_content = self.days.get(day, {})
+        return bool(day_content.get("activity")) and item_id == day_content.get("activity_id")
+
+    def items_for_day(self, day):
+        # Lo que se muestra en la lista: la actividad principal o los ejercicios, como (id, nombre)
+        day_content = self.days.get(day, {})
+        if day_content.get("activity"): return [(day_content["activity_id"], day_content["activity"])]
+        return [(ex["id"], ex["name"]) for ex in day_content.get("exercises", [])]
+
+    def total_series(self, day, item_id):
+        exercise = self.find_exercise(day, item_id)
+        return exercise.get("series", 1) if exercise else 1
+
+    def add_exercise(self, day, name, series, reps, description):
+        exercises = self.days[day]["exercises"]
+        exercise = {"id": item_id_for(name, plan_item_ids(self.days)), "name": name, "series": series, "reps": reps, "description": description}
+        exercises.append(exercise)
+        self.exercise_index[day][exercise["id"]] = len(exercises) - 1
+        self.dirty_days.add(day)
+        return exercise
+
+    def update_exercise(self, day, position, name, series, reps, description):
+        # Se conserva el ID, así el progreso registrado sigue asociado tras un cambio de nombre
+        exercises = self.days[day]["exercises"]
+        exercises[position] = {"id": exercises[position]["id"], "name": name, "series": series, "reps": reps, "description": description}
+        self.dirty_days.add(day)
+        return exercises[position]
+
+    def delete_exercise(self, day, item_id):
+        self.days[day]["exercises"] = [ex for ex in self.days[day]["exercises"] if ex["id"] != item_id]
+        # Las posiciones posteriores se desplazan, así que se reindexa solo este día
+        self.exercise_index[day] = index_exercises(self.days[day])
+        self.dirty_days.add(day)
+
+    def replace_days(self, days):
+        # Adopta un plan editado por fuera (recarga en caliente) conservando los días que no cambiaron;
+        # devuelve los días modificados, agregados o quitados
+        migrate_plan(days)
+        assigned = assign_item_ids(days)
+        changed = {day for day in [*self.days, *days] if self.days.get(day) != days.get(day)}
+        if not changed and list(self.days) == list(days): return changed
+        kept = {day: days[day] if day in changed else self.days[day] for day in days}
+        self.days.clear(); self.days.update(kept)
+        for day in changed:
+            if day in self.days: self.exercise_index[day] = index_exercises(self.days[day])
+            else: self.exercise_index.pop(day, None)
+        # Los ejercicios agregados a mano sin ID recibieron uno: hay que guardarlo
+        if assigned: self.dirty_days |= changed & set(self.days)
+        return changed
+
+    def resolve_legacy_id(self):
+        # Para migrar progreso por nombre: se busca primero en el día de la semana de la fecha
+        ids_by_day = {day_name: {ex["name"]: ex["id"] for ex in reversed(day_content.get("exercises", []))} for day_name, day_content in self.days.items()}
+        for day_name, day_content in self.days.items():
+            if day_content.get("activity"): ids_by_day[day_name][day_content["activity"]] = day_content["activity_id"]
+        any_day = {name: item_id for day_ids in ids_by_day.values() for name, item_id in day_ids.items()}
+        def resolve(date_str, item_name):
+            day_ids = ids_by_day.get(day_name_for(date.fromisoformat(date_str)), {})
+            if item_name in day_ids: return day_ids[item_name]
+            return any_day[item_name] if item_name in any_day else item_id_for(item_name)
+        return resolve
+
+    def resolve_completed_series(self):
+        # Para el progreso de entrenamiento.py (Completed=True/False): completado equivale a todas las series del día
+        return lambda date_str, item_id: self.total_series(day_name_for(date.fromisoformat(date_str)), item_id)
+
+
+# --- Sesión de Entrenamiento (plan + progreso, sin interfaz) ---
+# Lo que la app de Tk consume y lo que un script o un proceso de un pool puede usar sin
+# crear una ventana: carga el plan, migra el progreso heredado y responde consultas de avance.
+class TrainingSession:
+    def __init__(self, storage, writer=None, today=None, load=True):
+        self.storage = storage
+        self.writer = writer
+        self.today = today
+        self.plan = None
+        self.progress = None
+        # Funciones (fecha, id, series anteriores, series nuevas) llamadas tras cada cambio de progreso
+        self.progress_listeners = []
+        if load:
+            self.load_plan()
+            self.load_progress()
+
+    def load_plan(self):
+        self.plan = TrainingPlan.from_storage(self.storage)
+        return self.plan
+
+    def poll_plan(self):
+        # Días que cambiaron si el plan se editó por fuera desde la última lectura (vacío si no)
+        days = self.storage.poll_plan()
+        return self.plan.replace_days(days) if days is not None else set()
+
+    def load_progress(self):
+        if self.storage.needs_item_id_migration(): self.storage.migrate_item_ids(self.plan.resolve_legacy_id(), self.plan.resolve_completed_series())
+        # Solo se carga la semana actual; las fechas anteriores se paginan bajo demanda
+        self.progress = ProgressStore(self.storage, today=self.today, writer=self.writer)
+        return self.progress
+
+    def switch_storage(self, storage, writer=None, plan=None):
+        # Otro progreso (p. ej. otro atleta) con el plan ya cargado, o con el que se indique, sin releerlo
+        self.storage, self.writer = storage, writer
+        if plan is not None: self.plan = plan
+        return self.load_progress()
+
+    def series_completed(self, date_str, item_id):
+        return self.progress.series_completed(date_str, item_id)
+
+    def is_completed(self, date_str, day, item_id):
+        return self.progress.series_completed(date_str, item_id) >= self.plan.total_series(day, item_id)
+
+    def record_series(self, date_str, item_id, item_name, series_completed):
+        previous = self.progress.series_completed(date_str, item_id)
+        self.progress.set_series(date_str, item_id, item_name, series_completed)
+        for listener in self.progress_listeners: listener(date_str, item_id, previous, series_completed)
+
+    def day_completion(self, date_str):
+        # [(id, nombre, series hechas, series totales)] del día de la semana de date_str
+        day = day_name_for(date.fromisoformat(date_str))
+        done = self.progress.day(date_str)
+        return [(item_id, name, done.get(item_id, 0), self.plan.total_series(day, item_id)) for item_id, name in self.plan.items_for_day(day)]
+
+
+# --- Procesamiento por Lotes ---
+def summarize_files(plan_file, progress_file):
+    # Resumen de un par plan/progreso; pensado para correr en un proceso de un pool
+    storage = FileStorage(plan_file, progress_file)
+    try:
+        plan = TrainingPlan.from_storage(storage)
+        if storage.needs_item_id_migration():
+            storage.journal.resolve_legacy_id, storage.journal.resolve_completed_series = plan.resolve_legacy_id(), plan.resolve_completed_series()
+        days, rows, series_done, series_planned, items_completed = set(), 0, 0, 0, 0
+        for date_str, item_id, item_name, series_completed in storage.iter_progress():
+            total = plan.total_series(day_name_for(date.fromisoformat(date_str)), item_id)
+            days.add(date_str); rows += 1
+            series_done += min(series_completed, total); series_planned += total
+            items_completed += series_completed >= total
+    finally:
+        storage.journal.close()
+    return {"plan": plan_file, "progress": progress_file, "days_logged": len(days), "rows": rows, "items_completed": items_completed,
+            "series_completion_rate": round(series_done / series_planned, 4) if series_planned else 0.0}
+
+
+def migrate_files(plan_file, progress_file):
+    # Lleva un par plan/progreso de cualquier versión anterior al formato actual; pensado para un pool
+    storage = FileStorage(plan_file, progress_file)
+    try:
+        schema = file_progress_schema(progress_file)
+        plan = TrainingPlan.from_storage(storage)
+        if plan.modified: storage.save_plan(plan.days); plan.modified = False
+        migrated = storage.needs_item_id_migration()
+        if migrated: storage.migrate_item_ids(plan.resolve_legacy_id(), plan.resolve_completed_series())
+    finally:
+        storage.journal.close()
+    return {"plan": plan_file, "progress": progress_file, "schema": schema, "migrated": migrated}
+
+
+if __name__ == "__main__":
+    import argparse
+    # Solo la línea de comandos usa el pool; la app no paga la importación de multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    parser = argparse.ArgumentParser(description="Resume carpetas con plan.json y progress.csv sin abrir la interfaz.")
+    parser.add_argument("folders", nargs="+")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--migrar", action="store_true", help="Convertir el progreso de versiones anteriores al formato actual en lugar de resumir")
+    args = parser.parse_args()
+    pairs = [(os.path.join(folder, "plan.json"), os.path.join(folder, "progress.csv")) for folder in args.folders]
+    with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+        for summary in pool.map(migrate_files if args.migrar else summarize_files, *zip(*pairs)):
+            print(json.dumps(summary, ensure_ascii=False))
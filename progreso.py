@@ -0,0 +1,182 @@
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, timedelta
+
+# --- IDs Estables de Ejercicios ---
+# El ID se deriva del nombre al crear el ejercicio y luego se guarda en plan.json, así que
+# sobrevive a los renombres. Al derivarse del nombre, migrar el mismo progreso heredado en
+# distintas instalaciones produce siempre los mismos IDs. Si ya está en uso se toma el siguiente libre.
+MAX_ITEM_ID = 0x7FFFFFFF
+
+def item_id_for(item_name, taken=()):
+    item_id = zlib.crc32(item_name.encode('utf-8')) & MAX_ITEM_ID
+    while item_id in taken: item_id = (item_id + 1) & MAX_ITEM_ID
+    return item_id
+
+# --- Páginas Compactas de Progreso ---
+# Un rango de fechas se guarda en arrays tipados: cada día distinto una sola vez (ordinal y
+# dónde terminan sus filas) y por fila solo el ID (4 bytes) y las series (2 bytes), ordenadas
+# por ID dentro del día. Son ~6 bytes por fila en lugar de ~60 con un dict por fecha y un int
+# por ejercicio. day() arma el dict {id: series} de un solo día cuando se pide.
+MAX_SERIES = 0xFFFF
+def date_ordinal(date_str):
+    return date.fromisoformat(date_str).toordinal()
+
+
+class ProgressPage:
+    __slots__ = ("days", "ends", "item_ids", "series")
+
+    def __init__(self):
+        self.days, self.ends = array('i'), array('I')
+        self.item_ids, self.series = array('i'), array('H')
+
+    @classmethod
+    def from_status(cls, completion_status):
+        # {fecha: {id: series}} -> página ordenada
+        page = cls()
+        for date_str in sorted(completion_status):
+            items = completion_status[date_str]
+            if not items: continue
+            for item_id in sorted(items):
+                page.item_ids.append(item_id); page.series.append(items[item_id])
+            page.days.append(date_ordinal(date_str)); page.ends.append(len(page.item_ids))
+        return page
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def _rows(self, index):
+        # Rango de filas del día en la posición index de self.days
+        return self.ends[index - 1] if index else 0, self.ends[index]
+
+    def _find_day(self, ordinal):
+        index = bisect_left(self.days, ordinal)
+        return index, index < len(self.days) and self.days[index] == ordinal
+
+    def _day_items(self, index):
+        lo, hi = self._rows(index)
+        return dict(zip(self.item_ids[lo:hi], self.series[lo:hi]))
+
+    def day(self, date_str):
+        index, found = self._find_day(date_ordinal(date_str))
+        return self._day_items(index) if found else {}
+
+    def get(self, date_str, item_id):
+        index, found = self._find_day(date_ordinal(date_str))
+        if not found: return 0
+        lo, hi = self._rows(index)
+        position = bisect_left(self.item_ids, item_id, lo, hi)
+        return self.series[position] if position < hi and self.item_ids[position] == item_id else 0
+
+    def set(self, date_str, item_id, series_completed):
+        index, found = self._find_day(date_ordinal(date_str))
+        if not found:
+            self.days.insert(index, date_ordinal(date_str)); self.ends.insert(index, self.ends[index - 1] if index else 0)
+        lo, hi = self._rows(index)
+        position = bisect_left(self.item_ids, item_id, lo, hi)
+        if position < hi and self.item_ids[position] == item_id:
+            self.series[position] = series_completed
+            return
+        self.item_ids.insert(position, item_id); self.series.insert(position, series_completed)
+        for following in range(index, len(self.ends)): self.ends[following] += 1
+
+    def first_date(self):
+        return str(date.fromordinal(self.days[0])) if self.days else None
+
+    def items(self, date_from=None, date_to=None):
+        # (fecha, {id: series}) por día dentro del rango, en orden
+        start = bisect_left(self.days, date_ordinal(date_from)) if date_from else 0
+        end = bisect_right(self.days, date_ordinal(date_to)) if date_to else len(self.days)
+        for index in range(start, end):
+            yield str(date.fromordinal(self.days[index])), self._day_items(index)
+
+
+# --- Progreso con Carga Perezosa por Ventanas de Fechas ---
+# La semana actual se carga al iniciar y queda fija en memoria. Las fechas anteriores
+# se leen del almacenamiento por meses solo cuando alguien las pide (por ejemplo una
+# vista de historial) y se mantienen en una caché LRU acotada, de modo que ni el
+# arranque ni la memoria residente crecen con los años registrados.
+MAX_CACHED_MONTHS = 24
+
+
+class ProgressStore:
+    def __init__(self, storage, today=None, max_cached_months=MAX_CACHED_MONTHS, writer=None):
+        self.storage = storage
+        # Las escrituras pueden pasar por otro objeto con record_series (p. ej. el autoguardado)
+        self.writer = writer or storage
+        self.max_cached_months = max_cached_months
+        today = today or date.today()
+        week_start = today - timedelta(days=today.weekday())
+        self.hot_from, self.hot_to = str(week_start), str(week_start + timedelta(days=6))
+        self._version = storage.progress_version()
+        self._hot = ProgressPage.from_status(storage.load_progress(self.hot_from, self.hot_to))
+        self._months = OrderedDict()
+        # (fecha, ID) -> nombre de lo marcado desde la última relectura, para unirlo con lo de otras instancias
+        self._touched = {}
+
+    def _is_hot(self, date_str):
+        return self.hot_from <= date_str <= self.hot_to
+
+    def _month(self, year, month):
+        key = (year, month)
+        if key in self._months:
+            self._months.move_to_end(key)
+            return self._months[key]
+        first = date(year, month, 1)
+        last = (first + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+        status = self.storage.load_progress(str(first), str(last))
+        page = ProgressPage.from_status({d: items for d, items in status.items() if not self._is_hot(d)})
+        self._months[key] = page
+        while len(self._months) > self.max_cached_months: self._months.popitem(last=False)
+        return page
+
+    def _page_for(self, date_str):
+        if self._is_hot(date_str): return self._hot
+        return self._month(int(date_str[:4]), int(date_str[5:7]))
+
+    def day(self, date_str):
+        return self._page_for(date_str).day(date_str)
+
+    def series_completed(self, date_str, item_id):
+        return self._page_for(date_str).get(date_str, item_id)
+
+    def set_series(self, date_str, item_id, item_name, series_completed):
+        self._page_for(date_str).set(date_str, item_id, series_completed)
+        self._touched[(date_str, item_id)] = item_name
+        self.writer.record_series(date_str, item_id, item_name, series_completed)
+
+    def refresh(self):
+        # Si otra instancia escribió progreso se relee la semana actual y se descartan los meses en caché.
+        # Lo marcado aquí desde la última relectura se une por el máximo y se vuelve a escribir si hace falta.
+        version = self.storage.progress_version()
+        if version == self._version: return False
+        stored = ProgressPage.from_status(self.storage.load_progress(self.hot_from, self.hot_to))
+        for (date_str, item_id), item_name in self._touched.items():
+            if not self._is_hot(date_str): continue
+            mine, theirs = self._hot.get(date_str, item_id), stored.get(date_str, item_id)
+            if mine == theirs: continue
+            stored.set(date_str, item_id, max(mine, theirs))
+            # Reemplaza lo que el autoguardado tuviera pendiente para esta serie
+            self.writer.record_series(date_str, item_id, item_name, max(mine, theirs))
+        self._hot, self._version, self._touched = stored, version, {}
+        self._months.clear()
+        self.storage.mark_progress_synced(version)
+        return True
+
+    def first_date(self):
+        # Fecha más antigua con progreso (incluye lo marcado en esta sesión aunque aún no se haya escrito)
+        stored = self.storage.first_progress_date()
+        in_memory = [page.first_date() for page in [self._hot, *self._months.values()]]
+        return min([d for d in [stored, *in_memory] if d is not None], default=None)
+
+    def history(self, date_from, date_to):
+        # Devuelve {fecha: {id_ejercicio: series_completadas}} para el rango pedido, paginando los meses que falten
+        result = {}
+        current = date(int(date_from[:4]), int(date_from[5:7]), 1)
+        while str(current) <= date_to:
+            result.update(self._month(current.year, current.month).items(date_from, date_to))
+            current = (current + timedelta(days=31)).replace(day=1)
+        result.update(self._hot.items(date_from, date_to))
+        return dict(sorted(result.items()))
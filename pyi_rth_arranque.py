@@ -0,0 +1,3 @@
+# Runtime hook de PyInstaller: corre antes que calendario_entrenamiento.py y fija el
+# inicio de la medición de arranque lo más temprano posible dentro de Python.
+import arranque  # noqa: F401